@@ -0,0 +1,143 @@
+from datetime import timedelta
+from flask import current_app
+from models import db, Minister, Payment, WeeklyRollup, ArchivedYear
+from archive import payment_source, frozen_total
+
+
+class PaymentSummary:
+    def __init__(self, ministers):
+        self.ministers = ministers
+        self.total_amount = sum(m.amount for m in ministers)
+        self.total_payments = sum(m.count for m in ministers)
+
+
+def minister_totals(start_date=None, end_date=None, minister_ids=None):
+    # One GROUP BY over the payment range; the result has one row per minister, not per payment
+    payments = payment_source(start_date, end_date, minister_ids)
+    amount = db.func.sum(payments.c.amount)
+    stmt = db.select(
+        payments.c.minister_id.label('minister_id'),
+        Minister.full_name.label('name'),
+        amount.label('amount'),
+        db.func.count(payments.c.id).label('count'),
+        db.func.min(payments.c.amount).label('min_amount'),
+        db.func.max(payments.c.amount).label('max_amount'),
+        db.func.avg(payments.c.amount).label('avg_amount'),
+        db.func.min(payments.c.payment_date).label('first_payment'),
+        db.func.max(payments.c.payment_date).label('last_payment')
+    ).join(Minister, payments.c.minister_id == Minister.id)
+
+    if start_date is not None:
+        stmt = stmt.filter(payments.c.payment_date >= start_date)
+    if end_date is not None:
+        stmt = stmt.filter(payments.c.payment_date <= end_date)
+    if minister_ids is not None:
+        stmt = stmt.filter(payments.c.minister_id.in_(minister_ids))
+
+    stmt = stmt.group_by(payments.c.minister_id, Minister.full_name).order_by(amount.desc(), payments.c.minister_id)
+    return db.session.execute(stmt).all()
+
+
+def payment_rows(start_date, end_date, batch_size):
+    # Plain column tuples read through a server-side cursor, batch_size rows at a time
+    payments = payment_source(start_date, end_date)
+    stmt = db.select(
+        payments.c.payment_date,
+        Minister.full_name,
+        payments.c.amount,
+        payments.c.week_number,
+        payments.c.note
+    ).join(Minister, payments.c.minister_id == Minister.id).filter(
+        payments.c.payment_date >= start_date,
+        payments.c.payment_date <= end_date
+    ).order_by(payments.c.payment_date, payments.c.id).execution_options(yield_per=batch_size)
+    result = db.session.execute(stmt)
+    try:
+        for partition in result.partitions():
+            for row in partition:
+                yield row
+    finally:
+        result.close()
+
+
+def all_time_savings(use_rollups):
+    """Everything ever saved: the frozen carry-forward plus whatever is still in the hot table."""
+    boundary = ArchivedYear.boundary()
+    if boundary is None:
+        if use_rollups:
+            return db.session.query(db.func.sum(WeeklyRollup.total_amount)).scalar() or 0
+        return db.session.query(db.func.sum(Payment.amount)).scalar() or 0
+    if not use_rollups:
+        return frozen_total() + (db.session.query(db.func.sum(Payment.amount)).scalar() or 0)
+    # The ISO week holding the boundary mixes archived and hot days, so the days before its
+    # first full week are summed from payment and the rest from the rollup
+    first_monday = boundary + timedelta(days=-boundary.weekday() % 7)
+    straddling = db.session.query(db.func.sum(Payment.amount)).filter(
+        Payment.payment_date >= boundary, Payment.payment_date < first_monday
+    ).scalar() or 0
+    weeks = db.session.query(db.func.sum(WeeklyRollup.total_amount)).filter(
+        WeeklyRollup.week_start >= first_monday
+    ).scalar() or 0
+    return frozen_total() + straddling + weeks
+
+
+def week_savings(week_start, use_rollups):
+    """Savings in the ISO week starting on the Monday week_start."""
+    if use_rollups:
+        return db.session.query(db.func.sum(WeeklyRollup.total_amount)).filter(
+            WeeklyRollup.week_start == week_start
+        ).scalar() or 0
+    week_end = week_start + timedelta(days=6)
+    payments = payment_source(week_start, week_end)
+    return db.session.execute(
+        db.select(db.func.sum(payments.c.amount)).where(
+            payments.c.payment_date >= week_start,
+            payments.c.payment_date <= week_end
+        )
+    ).scalar() or 0
+
+
+def covers_whole_weeks(start_date, end_date):
+    # Monday through Sunday, so the range maps exactly onto ISO week rollups
+    return (start_date is not None and end_date is not None and start_date <= end_date
+            and start_date.isoweekday() == 1 and end_date.isoweekday() == 7)
+
+
+def weekly_minister_totals(start_date, end_date):
+    # Same shape as minister_totals() for the columns the summary needs, read from the rollup
+    amount = db.func.sum(WeeklyRollup.total_amount)
+    count = db.func.sum(WeeklyRollup.payment_count)
+    stmt = db.select(
+        WeeklyRollup.minister_id.label('minister_id'),
+        Minister.full_name.label('name'),
+        amount.label('amount'),
+        count.label('count')
+    ).join(Minister, WeeklyRollup.minister_id == Minister.id).filter(
+        WeeklyRollup.week_start >= start_date,
+        WeeklyRollup.week_start <= end_date - timedelta(days=6)
+    ).group_by(WeeklyRollup.minister_id, Minister.full_name).having(count > 0).order_by(
+        amount.desc(), WeeklyRollup.minister_id
+    )
+    return db.session.execute(stmt).all()
+
+
+def weekly_totals(start_date, end_date, minister_id=None):
+    # One row per ISO week in the range: (week_start, amount, count)
+    stmt = db.select(
+        WeeklyRollup.week_start,
+        db.func.sum(WeeklyRollup.total_amount).label('amount'),
+        db.func.sum(WeeklyRollup.payment_count).label('count')
+    ).filter(
+        WeeklyRollup.week_start >= start_date,
+        WeeklyRollup.week_start <= end_date
+    )
+    if minister_id is not None:
+        stmt = stmt.filter(WeeklyRollup.minister_id == minister_id)
+    stmt = stmt.group_by(WeeklyRollup.week_start).order_by(WeeklyRollup.week_start)
+    return db.session.execute(stmt).all()
+
+
+def payment_summary(start_date=None, end_date=None):
+    if current_app.config['USE_WEEKLY_ROLLUPS'] and covers_whole_weeks(start_date, end_date):
+        return PaymentSummary(weekly_minister_totals(start_date, end_date))
+    return PaymentSummary(minister_totals(start_date, end_date))
@@ -0,0 +1,189 @@
+from datetime import date, timedelta
+import numpy as np
+from flask import current_app
+from models import db, Minister
+from archive import payment_source
+from stats_cache import cached
+
+# Trend, consistency and projection metrics computed over whole payment columns at once.
+# Payments are bucketed into a minister x week matrix (ISO weeks, Monday first) with
+# np.bincount, and every metric below is a reduction over that matrix.
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def load_payment_arrays(start_date, end_date, batch_size=10000):
+    """Return (minister_ids, payment_days, amounts) arrays for payments in the range."""
+    # Core rows rather than ORM rows, and dates as ISO text that NumPy parses itself
+    payments = payment_source(start_date, end_date)
+    stmt = db.select(
+        payments.c.minister_id,
+        db.cast(payments.c.payment_date, db.String),
+        payments.c.amount
+    ).where(
+        payments.c.payment_date >= start_date,
+        payments.c.payment_date <= end_date
+    )
+
+    ids, days, amounts = [], [], []
+    # Through the session rather than a bare connection, so the read is routed like the
+    # roster query and both come from the same engine
+    result = db.session.execute(stmt, execution_options={'yield_per': batch_size})
+    for partition in result.partitions():
+        minister_ids, payment_days, payment_amounts = zip(*partition)
+        ids.append(np.array(minister_ids, dtype=np.int64))
+        days.append(np.array(payment_days, dtype='datetime64[D]'))
+        amounts.append(np.array(payment_amounts, dtype=np.float64))
+    if not ids:
+        return np.empty(0, np.int64), np.empty(0, 'datetime64[D]'), np.empty(0, np.float64)
+    return np.concatenate(ids), np.concatenate(days), np.concatenate(amounts)
+
+
+def moving_average(values, window):
+    # Trailing mean; the first weeks average over however many weeks exist so far
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def remaining_sundays(after):
+    # Sundays strictly after the given day up to the end of its year
+    first = after + timedelta(days=6 - after.weekday() or 7)
+    year_end = date(after.year, 12, 31)
+    return 0 if first > year_end else (year_end - first).days // 7 + 1
+
+
+def _week_matrix(rows, weeks, amounts, shape):
+    flat = rows * shape[1] + weeks
+    size = shape[0] * shape[1]
+    totals = np.bincount(flat, weights=amounts, minlength=size).reshape(shape)
+    counts = np.bincount(flat, minlength=size).reshape(shape)
+    return totals, counts
+
+
+def _round(value):
+    return round(float(value), 2)
+
+
+def savings_analytics(start_date, end_date, moving_average_weeks=4, projection_weeks=12):
+    """Weekly trend, percentiles, per-minister consistency and year-end projections.
+
+    The year-to-date figures behind the projection always start on 1 January of the end
+    date's year, so the payments read may begin before start_date.
+    """
+    load_start = min(start_date, date(end_date.year, 1, 1))
+    first_monday = load_start - timedelta(days=load_start.weekday())
+    n_weeks = (end_date - first_monday).days // 7 + 1
+
+    roster = db.session.execute(
+        db.select(Minister.id, Minister.full_name, Minister.date_joined)
+        .where(db.or_(Minister.date_joined.is_(None), Minister.date_joined <= end_date))
+        .order_by(Minister.id)
+    ).all()
+    roster_ids = np.array([row.id for row in roster], dtype=np.int64)
+    joined = np.array([row.date_joined or load_start for row in roster], dtype='datetime64[D]')
+
+    minister_ids, days, amounts = load_payment_arrays(load_start, end_date)
+    # Payments of ministers who joined after end_date have no row; leave them out
+    known = np.isin(minister_ids, roster_ids)
+    minister_ids, days, amounts = minister_ids[known], days[known], amounts[known]
+    rows = np.searchsorted(roster_ids, minister_ids)
+    weeks = ((days - np.datetime64(first_monday)).astype(np.int64) // 7)
+    shape = (len(roster), n_weeks)
+
+    in_range = days >= np.datetime64(start_date)
+    range_totals, range_counts = _week_matrix(rows[in_range], weeks[in_range], amounts[in_range], shape)
+    in_year = days >= np.datetime64(date(end_date.year, 1, 1))
+    year_totals, _ = _week_matrix(rows[in_year], weeks[in_year], amounts[in_year], shape)
+    all_totals, _ = _week_matrix(rows, weeks, amounts, shape)
+
+    # Weeks touched by the requested range. A week whose Sunday falls after end_date is
+    # still being collected, so it is listed but kept out of the trend and the rates.
+    first_week = (start_date - first_monday).days // 7
+    complete_weeks = ((end_date - first_monday).days + 1) // 7
+    week_starts = np.datetime64(first_monday) + 7 * np.arange(first_week, n_weeks)
+    weekly_totals = range_totals[:, first_week:].sum(axis=0)
+    weekly_counts = range_counts[:, first_week:].sum(axis=0)
+    trend_totals = weekly_totals[:max(complete_weeks - first_week, 0)]
+    weekly_average = moving_average(trend_totals, moving_average_weeks)
+    if len(trend_totals) >= 2:
+        slope, intercept = np.polyfit(np.arange(len(trend_totals)), trend_totals, 1)
+    else:
+        slope, intercept = 0.0, float(trend_totals[0]) if len(trend_totals) else 0.0
+
+    # Consistency: Sundays in the range on or after each minister joined, paid or missed
+    sundays = week_starts + 6
+    counted = (sundays >= np.datetime64(start_date)) & (sundays <= np.datetime64(end_date))
+    eligible = counted[None, :] & (sundays[None, :] >= joined[:, None])
+    paid = range_counts[:, first_week:] > 0
+    weeks_eligible = eligible.sum(axis=1)
+    weeks_paid = (eligible & paid).sum(axis=1)
+    consistency = np.divide(weeks_paid, weeks_eligible, out=np.zeros(len(roster)), where=weeks_eligible > 0)
+
+    # Projection: year to date plus the recent weekly rate for every Sunday left in the year
+    if complete_weeks:
+        recent = all_totals[:, max(complete_weeks - projection_weeks, 0):complete_weeks].mean(axis=1)
+    else:
+        recent = np.zeros(len(roster))
+    year_to_date = year_totals.sum(axis=1)
+    sundays_left = remaining_sundays(end_date)
+    projected = year_to_date + recent * sundays_left
+
+    minister_totals = range_totals.sum(axis=1)
+    minister_counts = range_counts.sum(axis=1)
+    range_amounts = amounts[in_range]
+    order = np.lexsort((roster_ids, -minister_totals))
+
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'total_amount': _round(range_amounts.sum()),
+        'total_payments': int(len(range_amounts)),
+        'trend': {'slope_per_week': _round(slope), 'intercept': _round(intercept)},
+        'payment_percentiles': {
+            f'p{p}': _round(v) for p, v in zip(PERCENTILES, np.percentile(range_amounts, PERCENTILES))
+        } if len(range_amounts) else {},
+        'minister_total_percentiles': {
+            f'p{p}': _round(v) for p, v in zip(PERCENTILES, np.percentile(minister_totals, PERCENTILES))
+        } if len(roster) else {},
+        'projection': {
+            'year': end_date.year,
+            'year_to_date': _round(year_to_date.sum()),
+            'remaining_sundays': sundays_left,
+            'projected_total': _round(projected.sum()),
+        },
+        'weeks': [
+            {
+                'week_start': str(week_start),
+                'total': _round(total),
+                'payments': int(count),
+                'moving_average': _round(weekly_average[i]) if i < len(weekly_average) else None,
+            }
+            for i, (week_start, total, count) in enumerate(zip(week_starts, weekly_totals, weekly_counts))
+        ],
+        'ministers': [
+            {
+                'minister_id': int(roster_ids[i]),
+                'full_name': roster[i].full_name,
+                'total': _round(minister_totals[i]),
+                'payments': int(minister_counts[i]),
+                'sundays_paid': int(weeks_paid[i]),
+                'sundays_missed': int(weeks_eligible[i] - weeks_paid[i]),
+                'consistency': round(float(consistency[i]), 4),
+                'recent_weekly_average': _round(recent[i]),
+                'year_to_date': _round(year_to_date[i]),
+                'projected_year_end': _round(projected[i]),
+            }
+            for i in order
+        ],
+    }
+
+
+def report_analytics(start_date, end_date):
+    # Shared by the CSV, PDF and JSON outputs; cached until the next write
+    return cached(f'analytics:{start_date.isoformat()}:{end_date.isoformat()}', lambda: savings_analytics(
+        start_date, end_date,
+        moving_average_weeks=current_app.config['ANALYTICS_MOVING_AVERAGE_WEEKS'],
+        projection_weeks=current_app.config['ANALYTICS_PROJECTION_WEEKS']
+    ))
@@ -0,0 +1,227 @@
+import hashlib
+from functools import wraps
+from datetime import datetime, date, timedelta
+from flask import Blueprint, current_app, jsonify, request, abort
+from flask_login import current_user
+from models import db, Minister, Payment, ArchivedYear, DataVersion
+from pagination import keyset_paginate
+from aggregates import minister_totals
+from archive import reaches_archive, source_for
+
+# Read-only JSON API for sync clients. Every response carries an ETag built from the data
+# version and the query string, so an unchanged poll is answered with 304 after reading
+# only the data_version row.
+
+api = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+MINISTER_FIELDS = {
+    'id': lambda m: m.id,
+    'full_name': lambda m: m.full_name,
+    'department': lambda m: m.department,
+    'phone': lambda m: m.phone,
+    'email': lambda m: m.email,
+    'date_joined': lambda m: m.date_joined,
+    'total_savings': lambda m: m.total_savings,
+    'created_at': lambda m: m.created_at,
+    'updated_at': lambda m: m.updated_at,
+}
+
+PAYMENT_FIELDS = {
+    'id': lambda p: p.id,
+    'minister_id': lambda p: p.minister_id,
+    'minister_name': lambda p: p.minister.full_name,
+    'amount': lambda p: p.amount,
+    'payment_date': lambda p: p.payment_date,
+    'week_number': lambda p: p.week_number,
+    'note': lambda p: p.note,
+    'created_at': lambda p: p.created_at,
+}
+
+TOTAL_FIELDS = {
+    'minister_id': lambda r: r.minister_id,
+    'full_name': lambda r: r.name,
+    'total_amount': lambda r: round(r.amount or 0, 2),
+    'payment_count': lambda r: r.count,
+    'min_amount': lambda r: r.min_amount,
+    'max_amount': lambda r: r.max_amount,
+    'avg_amount': lambda r: round(r.avg_amount or 0, 2),
+    'first_payment': lambda r: r.first_payment,
+    'last_payment': lambda r: r.last_payment,
+}
+
+
+def init_api(app):
+    app.register_blueprint(api)
+
+
+@api.before_request
+def require_login():
+    # JSON clients get a 401 rather than the HTML login redirect
+    if not current_user.is_authenticated:
+        abort(401, description='Login required')
+
+
+def json_error(error):
+    return jsonify({'error': error.description}), error.code
+
+
+# Registered per status code so they win over the app's HTML error handlers
+for code in (400, 401, 404):
+    api.register_error_handler(code, json_error)
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _fields(available):
+    # ?fields=id,amount picks a subset; unknown names are an error rather than silently dropped
+    requested = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    if not requested:
+        return list(available)
+    unknown = [f for f in requested if f not in available]
+    if unknown:
+        abort(400, description=f'Unknown field(s): {", ".join(unknown)}')
+    return requested
+
+
+def _serialize(item, fields, available):
+    return {field: _json_value(available[field](item)) for field in fields}
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        abort(400, description=f'Invalid {name} "{value}", expected YYYY-MM-DD')
+
+
+def _minister_ids_arg():
+    values = request.args.getlist('minister_id')
+    if not values:
+        return None
+    try:
+        return [int(v) for value in values for v in value.split(',') if v.strip()]
+    except ValueError:
+        abort(400, description='minister_id must be a number or a comma separated list of numbers')
+
+
+def _per_page():
+    per_page = request.args.get('per_page', current_app.config['API_PER_PAGE'], type=int)
+    return max(1, min(per_page, current_app.config['API_MAX_PER_PAGE']))
+
+
+def _etag():
+    # Same data version and same query string means the same body
+    key = f'{DataVersion.current()}:{request.path}:{sorted(request.args.items(multi=True))}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional(view):
+    """Answer If-None-Match polls with 304 before the view touches any table but data_version."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = _etag()
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify(view(*args, **kwargs))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+
+def _page_body(page, fields, available):
+    return {
+        'data': [_serialize(item, fields, available) for item in page.items],
+        'per_page': page.per_page,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    }
+
+
+@api.route('/ministers')
+@conditional
+def ministers():
+    """Ministers newest first, optionally filtered by department."""
+    fields = _fields(MINISTER_FIELDS)
+    query = Minister.query
+    department = request.args.get('department')
+    if department:
+        query = query.filter(Minister.department == department)
+    page = keyset_paginate(query, [Minister.id], after=request.args.get('after'),
+                           before=request.args.get('before'), per_page=_per_page(), with_total=False)
+    return _page_body(page, fields, MINISTER_FIELDS)
+
+
+@api.route('/ministers/<int:minister_id>')
+@conditional
+def minister(minister_id):
+    fields = _fields(MINISTER_FIELDS)
+    item = db.session.get(Minister, minister_id)
+    if item is None:
+        abort(404, description=f'No minister with id {minister_id}')
+    return {'data': _serialize(item, fields, MINISTER_FIELDS)}
+
+
+@api.route('/payments')
+@conditional
+def payments():
+    """Payments newest first, filtered by start_date, end_date and minister_id.
+
+    Archived years are only read when start_date reaches back into them.
+    """
+    fields = _fields(PAYMENT_FIELDS)
+    start_date = _date_arg('start_date')
+    end_date = _date_arg('end_date')
+    minister_ids = _minister_ids_arg()
+
+    payment = Payment
+    if start_date:
+        boundary = ArchivedYear.boundary()
+        if reaches_archive(start_date, boundary):
+            # Payment rows mapped over the union of payment and payment_archive
+            payment = db.aliased(Payment, source_for(boundary, start_date, end_date, minister_ids),
+                                 adapt_on_names=True)
+    query = db.session.query(payment)
+    if 'minister_name' in fields:
+        # Only pay for the join when the name was asked for
+        query = query.join(Minister, payment.minister_id == Minister.id).options(
+            db.contains_eager(payment.minister)
+        )
+
+    if start_date:
+        query = query.filter(payment.payment_date >= start_date)
+    if end_date:
+        query = query.filter(payment.payment_date <= end_date)
+    if minister_ids is not None:
+        query = query.filter(payment.minister_id.in_(minister_ids))
+
+    page = keyset_paginate(query, [payment.payment_date, payment.id], after=request.args.get('after'),
+                           before=request.args.get('before'), per_page=_per_page(), with_total=False)
+    return _page_body(page, fields, PAYMENT_FIELDS)
+
+
+@api.route('/totals')
+@conditional
+def totals():
+    """Per-minister totals over an optional date range, largest first."""
+    fields = _fields(TOTAL_FIELDS)
+    rows = minister_totals(_date_arg('start_date'), _date_arg('end_date'), _minister_ids_arg())
+    return {'data': [_serialize(row, fields, TOTAL_FIELDS) for row in rows]}
+
+
+@api.route('/analytics')
+@conditional
+def analytics():
+    """Trends, consistency and projections; defaults to the year ending today."""
+    from analytics import report_analytics
+    end_date = _date_arg('end_date') or date.today()
+    start_date = _date_arg('start_date') or end_date - timedelta(days=364)
+    if start_date > end_date:
+        abort(400, description='start_date must not be after end_date')
+    return report_analytics(start_date, end_date)
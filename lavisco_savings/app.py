@@ -1,16 +1,34 @@
+import os
 from flask import Flask
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from config import Config
-from models import db, User
+from models import db
+from database import configure_engine_options, init_engine
+from stats_cache import init_cache
+from fragments import init_fragments
+from assets import init_assets
+from metrics import init_metrics
+from reporting import init_reporting
+from auth import init_auth, load_cached_user
+from search import exclude_search_tables
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
     # Initialize extensions
+    configure_engine_options(app)
     db.init_app(app)
-    migrate = Migrate(app, db)
+    init_engine(app)
+    init_cache(app)
+    init_fragments(app)
+    init_assets(app)
+    init_metrics(app)
+    init_reporting(app)
+    init_auth(app)
+    migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'),
+                      include_object=exclude_search_tables)
     
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -19,25 +37,24 @@ def create_app(config_class=Config):
     
     @login_manager.user_loader
     def load_user(id):
-        return User.query.get(int(id))
+        return load_cached_user(int(id))
     
     # Import and register routes
     from routes import init_routes
     init_routes(app)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin user if not exists
-        if User.query.filter_by(username='admin').first() is None:
-            admin = User(
-                username='admin',
-                email='admin@lavisco.com',
-                full_name='System Administrator'
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
+    from report_routes import init_report_routes
+    init_report_routes(app)
+    
+    # Versioned JSON API
+    from api import init_api
+    init_api(app)
+    
+    # Register CLI commands
+    from commands import init_commands
+    init_commands(app)
+    
+    # Schema, the admin account and the search index are set up by `flask init-db`,
+    # not on every worker start
     
     return app
\ No newline at end of file
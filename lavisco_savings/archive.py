@@ -0,0 +1,144 @@
+from datetime import date
+from models import db, Payment, PaymentArchive, ArchivedYear, CarryForward, DataVersion
+
+# Closed years are moved out of the hot payment table into payment_archive, one transaction
+# per year, leaving a frozen per-minister carry-forward behind. Readers ask for the range they
+# need: only a range that starts before the archive boundary pays for the UNION ALL with the
+# archive, and savings before the boundary come from the carry-forward rather than a re-sum.
+
+PAYMENT_COLUMNS = ('id', 'minister_id', 'amount', 'payment_date', 'week_number', 'note',
+                   'created_at', 'updated_at')
+
+
+def reaches_archive(start_date, boundary):
+    # A range without a start runs from the very first payment
+    return boundary is not None and (start_date is None or start_date < boundary)
+
+
+def source_for(boundary, start_date=None, end_date=None, minister_ids=None):
+    """The table (or UNION ALL subquery) holding payments in the range, with payment's columns.
+
+    Callers still filter on the returned columns; the filters are repeated inside each branch
+    of a union so both halves are read through their indexes.
+    """
+    if not reaches_archive(start_date, boundary):
+        return Payment.__table__
+    if end_date is not None and end_date < boundary:
+        return PaymentArchive.__table__
+
+    branches = []
+    # payment first, so the union's columns correspond to payment's for db.aliased()
+    for table in (Payment.__table__, PaymentArchive.__table__):
+        branch = db.select(*(table.c[name] for name in PAYMENT_COLUMNS))
+        if start_date is not None:
+            branch = branch.where(table.c.payment_date >= start_date)
+        if end_date is not None:
+            branch = branch.where(table.c.payment_date <= end_date)
+        if minister_ids is not None:
+            branch = branch.where(table.c.minister_id.in_(minister_ids))
+        branches.append(branch)
+    return db.union_all(*branches).subquery('payments')
+
+
+def payment_source(start_date=None, end_date=None, minister_ids=None):
+    return source_for(ArchivedYear.boundary(), start_date, end_date, minister_ids)
+
+
+def frozen_year(start_date, boundary):
+    """The archived year whose carry-forward a balance at start_date builds on, or None.
+
+    Everything up to the end of that year is in the carry-forward; payments from the year
+    after it up to start_date still have to be summed.
+    """
+    if boundary is None:
+        return None
+    return min(start_date.year, boundary.year) - 1
+
+
+def frozen_total():
+    """Savings in every archived year, from the carry-forward."""
+    return db.session.query(db.func.sum(CarryForward.total_amount)).filter(CarryForward.at_boundary()).scalar() or 0
+
+
+def archivable_years(through_year):
+    # Years are archived oldest first and without gaps, starting after the latest archived one
+    boundary = ArchivedYear.boundary()
+    if boundary is not None:
+        first_year = boundary.year
+    else:
+        first_day = db.session.query(db.func.min(Payment.payment_date)).scalar()
+        if first_day is None:
+            return []
+        first_year = first_day.year
+    return list(range(first_year, through_year + 1))
+
+
+def year_totals(years):
+    """{year: (payments, amount)} still in the payment table for the given years."""
+    if not years:
+        return {}
+    year = db.extract('year', Payment.payment_date)
+    rows = db.session.execute(
+        db.select(year, db.func.count(Payment.id), db.func.sum(Payment.amount))
+        .where(Payment.payment_date < date(years[-1] + 1, 1, 1))
+        .group_by(year)
+    ).all()
+    totals = {y: (0, 0.0) for y in years}
+    for row_year, count, amount in rows:
+        key = max(int(row_year), years[0])
+        previous = totals.get(key, (0, 0.0))
+        totals[key] = (previous[0] + count, previous[1] + (amount or 0))
+    return totals
+
+
+def archive_year(year):
+    """Move the year's payments into payment_archive and freeze the carry-forward; commits.
+
+    Returns (payments moved, amount moved).
+    """
+    # Anything dated earlier that slipped in is swept along with the year
+    in_year = Payment.payment_date < date(year + 1, 1, 1)
+
+    count, amount = db.session.execute(
+        db.select(db.func.count(Payment.id), db.func.coalesce(db.func.sum(Payment.amount), 0)).where(in_year)
+    ).one()
+
+    # Previous carry-forward plus this year's sums, and the year's last payment per minister
+    carried = {
+        row.minister_id: [row.total_amount, row.payment_count, row.last_amount]
+        for row in CarryForward.query.filter_by(year=year - 1)
+    }
+    for minister_id, total, payments in db.session.execute(
+        db.select(Payment.minister_id, db.func.sum(Payment.amount), db.func.count(Payment.id))
+        .where(in_year).group_by(Payment.minister_id)
+    ):
+        entry = carried.setdefault(minister_id, [0.0, 0, None])
+        entry[0] += total
+        entry[1] += payments
+    ranked = db.select(
+        Payment.minister_id,
+        Payment.amount,
+        db.func.row_number().over(
+            partition_by=Payment.minister_id, order_by=(Payment.payment_date.desc(), Payment.id.desc())
+        ).label('position')
+    ).where(in_year).subquery()
+    for minister_id, last_amount in db.session.execute(
+        db.select(ranked.c.minister_id, ranked.c.amount).where(ranked.c.position == 1)
+    ):
+        carried[minister_id][2] = last_amount
+
+    columns = [Payment.__table__.c[name] for name in PAYMENT_COLUMNS]
+    db.session.execute(
+        db.insert(PaymentArchive.__table__).from_select(PAYMENT_COLUMNS, db.select(*columns).where(in_year))
+    )
+    if carried:
+        db.session.execute(db.insert(CarryForward), [
+            {'minister_id': minister_id, 'year': year, 'total_amount': total,
+             'payment_count': payments, 'last_amount': last_amount}
+            for minister_id, (total, payments, last_amount) in carried.items()
+        ])
+    db.session.execute(db.delete(Payment).where(in_year).execution_options(synchronize_session=False))
+    db.session.add(ArchivedYear(year=year, payment_count=count, total_amount=amount))
+    DataVersion.bump()
+    db.session.commit()
+    return count, amount
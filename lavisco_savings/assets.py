@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped; gzip is always written
+    brotli = None
+
+# `flask build-assets` copies every static file to static/dist under a content-hashed name,
+# next to gzip and brotli encoded copies, and writes a manifest. url_for('static', ...) then
+# points at the hashed name, which can be cached for a year because any change gets a new
+# name, and the static view answers with whichever encoded copy the browser accepts.
+
+BUILD_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+# Encodings in order of preference, with the suffix of their pre-encoded file
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Already-compressed formats gain nothing from another pass
+SKIP_COMPRESSION = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2', '.gz', '.br', '.zip'}
+
+
+def _hashed_name(path, digest):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{digest[:12]}{ext}'
+
+
+def _write_encoded(path, data):
+    # A variant is only kept when it is meaningfully smaller than the original
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    written = []
+    for suffix, encoded in variants:
+        if len(encoded) < len(data) * 0.9:
+            with open(path + suffix, 'wb') as f:
+                f.write(encoded)
+            written.append(suffix)
+    return written
+
+
+def build_assets(static_folder):
+    """Write hashed and encoded copies of every static file; returns the manifest written."""
+    build_dir = os.path.join(static_folder, BUILD_DIR)
+    # Start from nothing so renamed or deleted files leave no stale copies behind
+    shutil.rmtree(build_dir, ignore_errors=True)
+
+    manifest = {}
+    for directory, subdirs, files in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(static_folder):
+            subdirs[:] = [d for d in subdirs if d != BUILD_DIR]
+        for name in sorted(files):
+            source = os.path.join(directory, name)
+            filename = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            hashed = _hashed_name(filename, hashlib.sha256(data).hexdigest())
+            target = os.path.join(build_dir, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            if os.path.splitext(name)[1].lower() not in SKIP_COMPRESSION:
+                _write_encoded(target, data)
+            manifest[filename] = f'{BUILD_DIR}/{hashed}'
+
+    with open(os.path.join(build_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, BUILD_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def init_assets(app):
+    # Without a build (or with STATIC_FINGERPRINTS off, e.g. while editing CSS) url_for and the
+    # static view behave exactly as Flask's own
+    manifest = load_manifest(app.static_folder) if app.config['STATIC_FINGERPRINTS'] else {}
+    app.extensions['static_manifest'] = manifest
+    if not manifest:
+        return
+    hashed_files = set(manifest.values())
+    max_age = app.config['STATIC_IMMUTABLE_MAX_AGE']
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def static(filename):
+        if filename not in hashed_files:
+            return app.send_static_file(filename)
+        # Pick the best pre-encoded copy the browser accepts; the name never changes meaning,
+        # so it is cached for good and never revalidated
+        path = os.path.join(app.static_folder, *filename.split('/'))
+        encoding = None
+        for candidate, suffix in ENCODINGS:
+            if request.accept_encodings[candidate] and os.path.exists(path + suffix):
+                encoding, filename = candidate, filename + suffix
+                break
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=max_age)
+        if encoding is not None:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static
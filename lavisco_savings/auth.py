@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from werkzeug.security import generate_password_hash, check_password_hash
+from models import db, User
+from stats_cache import LRUCache
+from reporting import use_primary
+
+# Sessions are rebuilt from a short-lived per-process snapshot of the user row instead of
+# a query on every request, and password hashing runs on a small bounded thread pool so a
+# burst of logins cannot run more than a few hashes at once. A request still waits for its
+# own hash; once the pool and its queue are full, further requests are turned away at once.
+
+USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool is full or a hash did not finish in time."""
+
+
+class PasswordHasher:
+    def __init__(self, workers=2, max_pending=8, timeout=10):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        # Running plus queued hashes; anything beyond that is turned away immediately
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Still queued: drop it. Already running: it finishes and frees its slot itself
+            future.cancel()
+            raise HashingBusy()
+
+
+def init_auth(app):
+    app.extensions['user_cache'] = LRUCache(app.config['USER_CACHE_SIZE'])
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_MAX_PENDING'],
+        app.config['PASSWORD_HASH_TIMEOUT']
+    )
+
+
+def load_cached_user(user_id):
+    """Return a detached User for the session, read from the database at most once per TTL."""
+    cache = current_app.extensions['user_cache']
+    entry = cache.get(user_id)
+    if entry is None or entry[0] < time.monotonic():
+        # Sign-in state never comes from a reporting copy that may predate the account
+        with use_primary():
+            user = db.session.get(User, user_id)
+        if user is None:
+            cache.delete(user_id)
+            return None
+        entry = (time.monotonic() + current_app.config['USER_CACHE_TTL'],
+                 {key: getattr(user, key) for key in USER_COLUMNS})
+        cache.set(user_id, entry)
+        return user
+
+    # A fresh detached copy per request, so nothing is shared between threads
+    user = User(**entry[1])
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user(user_id):
+    if has_app_context() and 'user_cache' in current_app.extensions:
+        current_app.extensions['user_cache'].delete(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    # Other workers catch up when their copy expires
+    invalidate_user(target.id)
+
+
+def verify_password(user, password):
+    # Raises HashingBusy when the pool is full
+    return current_app.extensions['password_hasher'].run(check_password_hash, user.password_hash, password)
+
+
+def change_password(user, password):
+    user.password_hash = current_app.extensions['password_hasher'].run(generate_password_hash, password)
@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import event
+from models import db
+from seed_data import generate, scratch_app, login_client
+
+# Seeds a scratch database at each size, drives the hot routes through the test client and
+# records median latency, SQL statements and peak Python memory per route. PDF rendering
+# happens in the report worker processes, so its memory is not part of the peak figure.
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+# Run in a fresh interpreter so nothing is already imported or connected
+COLD_START_SCRIPT = """
+import json, sys, time, tracemalloc
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+queries = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: queries.append(1))
+if 'trace' in sys.argv:
+    tracemalloc.start()
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+finished = time.perf_counter()
+print(json.dumps({'import': imported - started, 'total': finished - started, 'queries': len(queries),
+                  'peak': tracemalloc.get_traced_memory()[1]}))
+"""
+
+# Regressions smaller than this are treated as timer noise
+LATENCY_FLOOR_MS = 5.0
+
+
+def _routes(first_day, last_day):
+    # Summaries cover the whole history; detailed reports cover the last quarter
+    whole = {'start_date': first_day.isoformat(), 'end_date': last_day.isoformat()}
+    quarter = {'start_date': (last_day - timedelta(weeks=13)).isoformat(), 'end_date': last_day.isoformat()}
+    return [
+        ('dashboard', 'GET', '/dashboard', None),
+        ('payments', 'GET', '/payments', None),
+        ('payments_filtered', 'GET', f'/payments?start_date={quarter["start_date"]}&end_date={quarter["end_date"]}', None),
+        ('ministers', 'GET', '/ministers', None),
+        ('ministers_search', 'GET', '/ministers?search=grace', None),
+        ('csv_summary', 'POST', '/reports/generate/summary', whole),
+        ('csv_detailed', 'POST', '/reports/generate/detailed', quarter),
+        ('csv_analytics', 'POST', '/reports/generate/analytics', whole),
+        ('pdf_summary', 'POST', '/reports/pdf/summary', whole),
+        ('pdf_detailed', 'POST', '/reports/pdf/detailed', quarter),
+    ]
+
+
+def ministers_for(payments):
+    # Ministers joined at any point in the last decade and pay on about 200 Sundays each,
+    # so this leaves room for every size to be reached
+    return max(50, payments // 150)
+
+
+def _reset_caches(app):
+    # Every timed request starts cold: no cached dashboard stats and no rendered PDFs
+    app.extensions['stats_cache'].clear()
+    shutil.rmtree(app.config['REPORT_CACHE_DIR'], ignore_errors=True)
+
+
+def _request(client, method, url, data):
+    response = client.open(url, method=method, data=data)
+    # Streaming responses only do their work when the body is read
+    response.get_data()
+    if response.status_code != 200:
+        raise RuntimeError(f'{method} {url} returned {response.status_code}')
+
+
+def _measure(app, client, method, url, data, repeat):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries[-1] += 1
+
+    # Warm-up so imports, template compilation and the worker pool are not billed to the route
+    _reset_caches(app)
+    _request(client, method, url, data)
+
+    timings = []
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(repeat):
+            _reset_caches(app)
+            queries.append(0)
+            started = time.perf_counter()
+            _request(client, method, url, data)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    # Tracing slows everything down, so memory gets its own run
+    _reset_caches(app)
+    tracemalloc.start()
+    try:
+        _request(client, method, url, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'latency_ms': round(statistics.median(timings), 2),
+        'queries': max(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def measure_cold_start(repeat=3):
+    """Time importing app and calling create_app() in new interpreters, as a worker boot does."""
+    workdir = tempfile.mkdtemp(prefix='lavisco-boot-')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(workdir, "boot.db")}')
+    env.pop('FLASK_APP', None)
+    def boot(*args):
+        output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, *args], env=env, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    try:
+        runs = [boot() for _ in range(repeat)]
+        # Tracing slows imports down several times over, so memory gets its own run
+        traced = boot('trace')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'latency_ms': round(statistics.median(run['total'] for run in runs) * 1000, 2),
+        'import_ms': round(statistics.median(run['import'] for run in runs) * 1000, 2),
+        'queries': max(run['queries'] for run in runs),
+        'peak_kb': round(traced['peak'] / 1024, 1),
+    }
+
+
+def run_benchmarks(config_class, sizes=DEFAULT_SIZES, repeat=3, echo=print):
+    """Return {"<payments>": {route: {latency_ms, queries, peak_kb}}} for each data size,
+    plus {"cold_start": {"create_app": ...}} for a worker boot."""
+    results = {'cold_start': {'create_app': measure_cold_start(repeat)}}
+    echo(f'  {"boot":>8} {"create_app":<18} {format_result(results["cold_start"]["create_app"])}')
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix='lavisco-bench-')
+        try:
+            # Slow query warnings would drown the results table
+            app = scratch_app(config_class, workdir, SLOW_QUERY_THRESHOLD_MS=60000)
+            with app.app_context():
+                started = time.perf_counter()
+                ministers, payments = generate(ministers=ministers_for(size), payments=size)
+                echo(f'Seeded {ministers} ministers and {payments} payments in {time.perf_counter() - started:.1f}s')
+                last_day = date.today()
+                first_day = db.session.execute(db.text('SELECT min(payment_date) FROM payment')).scalar()
+                first_day = date.fromisoformat(str(first_day)) if first_day else last_day
+
+            client = login_client(app)
+            results[str(size)] = {}
+            for name, method, url, data in _routes(first_day, last_day):
+                with app.app_context():
+                    results[str(size)][name] = _measure(app, client, method, url, data, repeat)
+                echo(f'  {size:>8} {name:<18} {format_result(results[str(size)][name])}')
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def format_result(result):
+    return f'{result["latency_ms"]:>10.2f} ms {result["queries"]:>5} queries {result["peak_kb"]:>10.1f} KiB'
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Return human readable regressions against the baseline.
+
+    Latency and memory may grow by the tolerance fraction; query counts must not grow at all.
+    Sizes or routes missing from the baseline are skipped.
+    """
+    regressions = []
+    for size, routes in results.items():
+        for name, current in routes.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(f'{name} @ {size}: {current["queries"]} queries, baseline {previous["queries"]}')
+            limit = previous['latency_ms'] * (1 + tolerance)
+            if current['latency_ms'] > max(limit, previous['latency_ms'] + LATENCY_FLOOR_MS):
+                regressions.append(f'{name} @ {size}: {current["latency_ms"]:.2f} ms, '
+                                   f'baseline {previous["latency_ms"]:.2f} ms')
+            if current['peak_kb'] > previous['peak_kb'] * (1 + tolerance):
+                regressions.append(f'{name} @ {size}: {current["peak_kb"]:.1f} KiB peak, '
+                                   f'baseline {previous["peak_kb"]:.1f} KiB')
+    return regressions
@@ -0,0 +1,239 @@
+import os
+import click
+from models import db, User, Minister, Payment, CarryForward, WeeklyRollup, DataVersion
+from payment_import import import_payments
+from search import fts_enabled, rebuild_index, setup_search
+
+
+def reconcile_total_savings(chunk_size=500, fix=True):
+    # Walk ministers in id order, comparing stored totals with one GROUP BY per chunk
+    checked = 0
+    repaired = []
+    last_id = 0
+    while True:
+        chunk = db.session.execute(
+            db.select(Minister.id, Minister.total_savings)
+            .where(Minister.id > last_id)
+            .order_by(Minister.id)
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            break
+        ids = [row.id for row in chunk]
+        sums = dict(db.session.execute(
+            db.select(Payment.minister_id, db.func.sum(Payment.amount))
+            .where(Payment.minister_id.in_(ids))
+            .group_by(Payment.minister_id)
+        ).all())
+        # Archived years count through their frozen carry-forward
+        frozen = dict(db.session.execute(
+            db.select(CarryForward.minister_id, CarryForward.total_amount)
+            .where(CarryForward.minister_id.in_(ids), CarryForward.at_boundary())
+        ).all())
+        chunk_repairs = len(repaired)
+        for row in chunk:
+            expected = (sums.get(row.id) or 0) + (frozen.get(row.id) or 0)
+            if row.total_savings is None or abs(row.total_savings - expected) > 0.005:
+                repaired.append((row.id, row.total_savings, expected))
+                if fix:
+                    db.session.execute(
+                        db.update(Minister)
+                        .where(Minister.id == row.id)
+                        .values(total_savings=expected)
+                        .execution_options(synchronize_session=False)
+                    )
+        if fix and len(repaired) > chunk_repairs:
+            DataVersion.bump()
+            db.session.commit()
+        checked += len(chunk)
+        last_id = ids[-1]
+    return checked, repaired
+
+
+def init_database(app, admin_password='admin123'):
+    # Migrations first, then the data the app expects to find; safe to run repeatedly
+    from flask_migrate import upgrade
+    upgrade()
+    
+    messages = []
+    if User.query.filter_by(username='admin').first() is None:
+        admin = User(
+            username='admin',
+            email='admin@lavisco.com',
+            full_name='System Administrator'
+        )
+        admin.set_password(admin_password)
+        db.session.add(admin)
+        db.session.commit()
+        messages.append('Created the admin user.')
+    
+    if setup_search(app):
+        messages.append('Minister search index is ready.')
+    
+    # Seed the weekly rollups the first time they appear next to existing payments
+    if WeeklyRollup.query.first() is None and Payment.query.first() is not None:
+        count = WeeklyRollup.rebuild()
+        DataVersion.bump()
+        db.session.commit()
+        messages.append(f'Built {count} weekly rollup rows.')
+    return messages
+
+
+def init_commands(app):
+    @app.cli.command('init-db')
+    @click.option('--admin-password', default='admin123', show_default=True,
+                  help='Password for the admin user if it has to be created.')
+    def init_db(admin_password):
+        """Apply migrations and create the admin user, search index and rollups."""
+        for message in init_database(app, admin_password):
+            click.echo(message)
+        click.echo('Database is up to date.')
+    
+    @app.cli.command('reconcile-totals')
+    @click.option('--chunk-size', default=500, show_default=True, help='Ministers checked per transaction.')
+    @click.option('--dry-run', is_flag=True, help='Report mismatches without repairing them.')
+    def reconcile_totals(chunk_size, dry_run):
+        """Check every minister's total_savings against their payments and repair drift."""
+        checked, repaired = reconcile_total_savings(chunk_size, fix=not dry_run)
+        for minister_id, stored, expected in repaired:
+            click.echo(f'Minister {minister_id}: stored {stored} expected {expected:.2f}')
+        action = 'would be repaired' if dry_run else 'repaired'
+        click.echo(f'Checked {checked} ministers, {len(repaired)} {action}.')
+    
+    @app.cli.command('rebuild-rollups')
+    @click.option('--batch-size', default=5000, show_default=True, help='Rows read and inserted per batch.')
+    def rebuild_rollups(batch_size):
+        """Regenerate the weekly rollup table from the payment history."""
+        count = WeeklyRollup.rebuild(batch_size)
+        DataVersion.bump()
+        db.session.commit()
+        click.echo(f'Rebuilt {count} weekly rollup rows.')
+    
+    @app.cli.command('archive-payments')
+    @click.option('--through-year', required=True, type=int, help='Last year to archive; it must be closed.')
+    @click.option('--dry-run', is_flag=True, help='Show what would be moved without moving it.')
+    def archive_payments(through_year, dry_run):
+        """Move closed years out of the payment table into the archive, oldest first."""
+        from datetime import date
+        from archive import archivable_years, archive_year, year_totals
+        if through_year >= date.today().year:
+            raise click.BadParameter(f'{through_year} is not closed yet.', param_hint='--through-year')
+        years = archivable_years(through_year)
+        if not years:
+            click.echo('Nothing to archive.')
+            return
+        if dry_run:
+            for year, (count, amount) in year_totals(years).items():
+                click.echo(f'{year}: {count} payments totalling {amount:.2f} would be archived')
+            return
+        for year in years:
+            count, amount = archive_year(year)
+            click.echo(f'{year}: archived {count} payments totalling {amount:.2f}')
+        click.echo(f'Payments before {through_year + 1}-01-01 are archived.')
+    
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Write content-hashed, gzip and brotli encoded copies of the static files."""
+        from assets import build_assets, brotli
+        manifest = build_assets(app.static_folder)
+        if brotli is None:
+            click.echo('brotli is not installed; only gzip variants were written.')
+        click.echo(f'Fingerprinted {len(manifest)} static files; restart the app to serve them.')
+    
+    @app.cli.command('import-payments')
+    @click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--dry-run', is_flag=True, help='Validate the file without saving anything.')
+    def import_payments_command(csv_file, dry_run):
+        """Import payments from a CSV with minister, amount, date, week and note columns."""
+        result = import_payments(csv_file, dry_run=dry_run)
+        for line, message in result.errors:
+            click.echo(f'Line {line}: {message}', err=True)
+        action = 'Validated' if dry_run else 'Imported'
+        click.echo(f'{action} {result.inserted} payments totalling {result.total_amount:.2f}; '
+                   f'{len(result.errors)} rows rejected.')
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Rebuild the minister full-text search index."""
+        if not fts_enabled():
+            click.echo('Full-text search is not available on this database; LIKE search is used instead.')
+            return
+        rebuild_index()
+        click.echo('Minister search index rebuilt.')
+    
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Fail if a hot query falls back to a full scan of the payment table."""
+        from config import Config
+        from query_plans import check_query_plans
+        failures, checked = check_query_plans(Config)
+        for statement, plan in failures:
+            click.echo(statement, err=True)
+            for line in plan:
+                click.echo(f'    {line}', err=True)
+        click.echo(f'Checked {checked} distinct queries, {len(failures)} full payment table scans.')
+        if failures:
+            raise SystemExit(1)
+    
+    @app.cli.command('seed-data')
+    @click.option('--ministers', default=100, show_default=True, help='Ministers to create.')
+    @click.option('--payments', default=10000, show_default=True, help='Weekly Sunday payments to create.')
+    @click.option('--seed', default=1, show_default=True, help='Random seed, for repeatable data.')
+    @click.option('--batch-size', default=10000, show_default=True, help='Payments inserted per statement.')
+    def seed_data_command(ministers, payments, seed, batch_size):
+        """Bulk-generate synthetic ministers and their weekly Sunday payments."""
+        from seed_data import generate
+        created, inserted = generate(ministers, payments, seed=seed, batch_size=batch_size)
+        click.echo(f'Created {created} ministers and {inserted} payments.')
+    
+    @app.cli.command('benchmark')
+    @click.option('--sizes', default='1000,100000,1000000', show_default=True,
+                  help='Comma separated payment counts to benchmark at.')
+    @click.option('--repeat', default=3, show_default=True, help='Timed requests per route; the median is kept.')
+    @click.option('--baseline', 'baseline_path', default=os.path.join(app.root_path, 'benchmark_baseline.json'),
+                  show_default=True, type=click.Path(dir_okay=False),
+                  help='Baseline results to compare against; relative paths are taken from the current directory.')
+    @click.option('--tolerance', default=0.25, show_default=True, help='Allowed latency and memory growth.')
+    @click.option('--save-baseline', is_flag=True, help='Store these results as the new baseline.')
+    def benchmark_command(sizes, repeat, baseline_path, tolerance, save_baseline):
+        """Time the hot routes on seeded scratch databases and compare with the baseline.
+
+        Timings depend on the machine, so no baseline ships with the app: run once with
+        --save-baseline on the machine that checks for regressions, then without it to compare.
+        """
+        from config import Config
+        from benchmark import run_benchmarks, load_baseline, save_baseline as store, compare
+        sizes = [int(size) for size in sizes.split(',') if size.strip()]
+        results = run_benchmarks(Config, sizes, repeat, echo=click.echo)
+        if save_baseline:
+            store(baseline_path, results)
+            click.echo(f'Baseline written to {baseline_path}.')
+            return
+        baseline = load_baseline(baseline_path)
+        if baseline is None:
+            click.echo(f'No baseline at {baseline_path}; run with --save-baseline to create one.', err=True)
+            raise SystemExit(1)
+        regressions = compare(results, baseline, tolerance)
+        for regression in regressions:
+            click.echo(regression, err=True)
+        click.echo(f'{len(regressions)} regressions against {baseline_path}.')
+        if regressions:
+            raise SystemExit(1)
+    
+    @app.cli.command('generate-statements')
+    @click.option('--start-date', required=True, type=click.DateTime(formats=['%Y-%m-%d']), help='First day, YYYY-MM-DD.')
+    @click.option('--end-date', required=True, type=click.DateTime(formats=['%Y-%m-%d']), help='Last day, YYYY-MM-DD.')
+    @click.option('--output', required=True, type=click.Path(dir_okay=False), help='Zip file to write.')
+    @click.option('--timeout', default=3600, show_default=True, type=click.IntRange(min=1),
+                  help='Seconds to wait for the batch; the web timeout is far too short for every minister.')
+    def generate_statements_command(start_date, end_date, output, timeout):
+        """Render every minister's statement PDF in parallel and zip them."""
+        import shutil
+        import report_jobs
+        try:
+            job_id = report_jobs.render_now('statements', start_date.date(), end_date.date(), timeout=timeout)
+        except (RuntimeError, TimeoutError) as e:
+            click.echo(str(e), err=True)
+            raise SystemExit(1)
+        shutil.copyfile(report_jobs.artifact_path(job_id), output)
+        click.echo(f'Statements written to {output}.')
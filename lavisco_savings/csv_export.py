@@ -0,0 +1,114 @@
+import csv
+import io
+from flask import Response, make_response, stream_with_context
+from aggregates import payment_rows, payment_summary
+
+
+def detailed_report_rows(start_date, end_date, batch_size):
+    # Write header
+    yield ['Lavisco Ministers Saving Scheme - Detailed Report']
+    yield [f'Period: {start_date} to {end_date}']
+    yield ['']
+
+    # Write payment details
+    yield ['Payment Details']
+    yield ['Date', 'Minister Name', 'Amount', 'Week Number', 'Note']
+
+    for row in payment_rows(start_date, end_date, batch_size):
+        yield [
+            row.payment_date.strftime('%Y-%m-%d'),
+            row.full_name,
+            f'${row.amount:.2f}',
+            row.week_number or '',
+            row.note or ''
+        ]
+
+
+def summary_report_rows(start_date, end_date):
+    summary = payment_summary(start_date, end_date)
+
+    # Write header
+    yield ['Lavisco Ministers Saving Scheme - Summary Report']
+    yield [f'Period: {start_date} to {end_date}']
+    yield ['']
+
+    # Write summary statistics
+    yield ['Summary Statistics']
+    yield ['Total Amount', f'UGX{summary.total_amount:.2f}']
+    yield ['Total Payments', summary.total_payments]
+    yield ['']
+
+    # Write minister totals
+    yield ['Minister Contributions']
+    yield ['Minister Name', 'Total Amount', 'Number of Payments']
+
+    for row in summary.ministers:
+        yield [row.name, f'${row.amount:.2f}', row.count]
+
+
+def analytics_report_rows(start_date, end_date):
+    # NumPy is only loaded once somebody asks for analytics
+    from analytics import report_analytics
+    analytics = report_analytics(start_date, end_date)
+    projection = analytics['projection']
+
+    # Write header
+    yield ['Lavisco Ministers Saving Scheme - Analytics Report']
+    yield [f'Period: {start_date} to {end_date}']
+    yield ['']
+
+    # Write range statistics
+    yield ['Summary Statistics']
+    yield ['Total Amount', f'UGX{analytics["total_amount"]:.2f}']
+    yield ['Total Payments', analytics['total_payments']]
+    yield ['Weekly Trend', f'{analytics["trend"]["slope_per_week"]:+.2f} per week']
+    for name, value in analytics['payment_percentiles'].items():
+        yield [f'Payment {name}', f'{value:.2f}']
+    yield [f'{projection["year"]} Year to Date', f'{projection["year_to_date"]:.2f}']
+    yield [f'{projection["year"]} Projected Total', f'{projection["projected_total"]:.2f}']
+    yield ['Sundays Remaining', projection['remaining_sundays']]
+    yield ['']
+
+    # Write the weekly trend
+    yield ['Weekly Totals']
+    yield ['Week Starting', 'Total', 'Payments', 'Moving Average']
+    for week in analytics['weeks']:
+        average = week['moving_average']
+        yield [week['week_start'], f'{week["total"]:.2f}', week['payments'], '' if average is None else f'{average:.2f}']
+    yield ['']
+
+    # Write per-minister consistency and projections
+    yield ['Minister Analytics']
+    yield ['Minister Name', 'Total', 'Payments', 'Sundays Paid', 'Sundays Missed', 'Consistency',
+           'Recent Weekly Average', 'Year to Date', 'Projected Year End']
+    for row in analytics['ministers']:
+        yield [row['full_name'], f'{row["total"]:.2f}', row['payments'], row['sundays_paid'],
+               row['sundays_missed'], f'{row["consistency"]:.0%}', f'{row["recent_weekly_average"]:.2f}',
+               f'{row["year_to_date"]:.2f}', f'{row["projected_year_end"]:.2f}']
+
+
+def iter_csv_chunks(rows, batch_size):
+    # Encode rows batch_size at a time so each chunk sent to the client is a reasonable size
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def csv_response(rows, filename, streaming=True, batch_size=1000):
+    if streaming:
+        response = Response(stream_with_context(iter_csv_chunks(rows, batch_size)), mimetype='text/csv')
+    else:
+        response = make_response(''.join(iter_csv_chunks(rows, batch_size)))
+        response.headers['Content-type'] = 'text/csv'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+from models import db
+
+
+def database_profile(config):
+    profile = config.get('DATABASE_PROFILE')
+    if profile:
+        return profile
+    return 'sqlite' if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite') else 'server'
+
+
+def engine_options(config):
+    profile = database_profile(config)
+    if profile == 'sqlite' and config['SQLALCHEMY_DATABASE_URI'] in ('sqlite://', 'sqlite:///:memory:'):
+        # Flask-SQLAlchemy gives in-memory databases a single static connection
+        return {}
+    if profile == 'sqlite':
+        # A file database shares one lock, so a small pool is plenty; the busy timeout is also
+        # handed to the driver so lock waits happen inside sqlite3 rather than failing at once
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000},
+        }
+    if profile == 'server':
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': True,
+        }
+    raise ValueError(f'Unknown DATABASE_PROFILE: {profile}')
+
+
+def sqlite_pragmas(config):
+    return [
+        'PRAGMA journal_mode=WAL',
+        f'PRAGMA synchronous={config["SQLITE_SYNCHRONOUS"]}',
+        f'PRAGMA busy_timeout={int(config["SQLITE_BUSY_TIMEOUT_MS"])}',
+        f'PRAGMA mmap_size={int(config["SQLITE_MMAP_SIZE"])}',
+        f'PRAGMA cache_size=-{int(config["SQLITE_CACHE_SIZE_KB"])}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+
+def configure_engine_options(app):
+    # Must run before db.init_app(); explicit SQLALCHEMY_ENGINE_OPTIONS still win
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+
+def init_engine(app):
+    # Must run after db.init_app() and before the first connection is opened
+    if database_profile(app.config) != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(app.config)
+    in_memory = app.config['SQLALCHEMY_DATABASE_URI'] in ('sqlite://', 'sqlite:///:memory:')
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                if in_memory and 'journal_mode' in pragma:
+                    continue
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', apply_pragmas)
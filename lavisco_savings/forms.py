@@ -1,7 +1,15 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, PasswordField, SubmitField, BooleanField, FloatField, DateField, TextAreaField, SelectField, IntegerField
+from wtforms.widgets import HiddenInput
 from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError, NumberRange, Optional
-from models import User, Minister
+from models import db, User, Minister, ArchivedYear
+
+def check_open_date(payment_date):
+    # Archived years are frozen; their payments can no longer be added to or moved into
+    boundary = ArchivedYear.boundary()
+    if boundary is not None and payment_date < boundary:
+        raise ValidationError(f'Payments before {boundary:%Y-%m-%d} are archived and can no longer be changed.')
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -24,7 +32,9 @@ class MinisterForm(FlaskForm):
     submit = SubmitField('Save Minister')
 
 class PaymentForm(FlaskForm):
-    minister_id = SelectField('Minister', coerce=int, validators=[DataRequired()])
+    # The minister is picked through the lookup endpoint; only the chosen id is posted and checked
+    minister_id = IntegerField('Minister', widget=HiddenInput(), validators=[DataRequired(message='Please choose a minister.')])
+    minister_name = StringField('Minister', validators=[Optional()])
     amount = FloatField('Amount', validators=[DataRequired(), NumberRange(min=0.01)])
     payment_date = DateField('Payment Date', validators=[DataRequired()])
     week_number = IntegerField('Week Number', validators=[Optional(), NumberRange(min=1)])
@@ -33,7 +43,30 @@ class PaymentForm(FlaskForm):
     
     def __init__(self, *args, **kwargs):
         super(PaymentForm, self).__init__(*args, **kwargs)
-        self.minister_id.choices = [(m.id, m.full_name) for m in Minister.query.order_by('full_name').all()]
+        if self.minister_id.data and not self.minister_name.data:
+            self.minister_name.data = db.session.query(Minister.full_name).filter_by(id=self.minister_id.data).scalar()
+    
+    def validate_minister_id(self, field):
+        if db.session.query(Minister.id).filter_by(id=field.data).first() is None:
+            raise ValidationError('Please choose a minister from the list.')
+    
+    def validate_payment_date(self, field):
+        check_open_date(field.data)
+
+class PaymentImportForm(FlaskForm):
+    file = FileField('CSV File', validators=[FileRequired(), FileAllowed(['csv'], 'Please upload a .csv file')])
+    dry_run = BooleanField('Validate only (do not save)')
+    submit = SubmitField('Import Payments')
+
+class BatchPaymentForm(FlaskForm):
+    # Per-minister amounts are posted as amount-<minister id> fields alongside this form
+    payment_date = DateField('Payment Date', validators=[DataRequired()])
+    week_number = IntegerField('Week Number', validators=[Optional(), NumberRange(min=1)])
+    note = StringField('Note', validators=[Optional(), Length(max=200)])
+    submit = SubmitField('Save All Payments')
+    
+    def validate_payment_date(self, field):
+        check_open_date(field.data)
 
 class ReportForm(FlaskForm):
     start_date = DateField('Start Date', validators=[DataRequired()])
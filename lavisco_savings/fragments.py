@@ -0,0 +1,25 @@
+from flask import current_app
+from markupsafe import Markup
+from stats_cache import LRUCache
+
+# Rendered table rows cached per process. Callers key a row by what it shows: the entity id
+# plus its updated_at, or the data version for rows that also show joined data. A page
+# of unchanged rows is then mostly dictionary lookups instead of template rendering.
+
+
+def cached_fragment(template_name, key, **context):
+    """Render template_name with context, or reuse the copy rendered for the same key."""
+    cache = current_app.extensions['fragment_cache']
+    cache_key = (template_name, *key)
+    html = cache.get(cache_key)
+    if html is None:
+        # Rows only use their own context and url_for, so the template is rendered directly
+        # rather than through render_template and its per-call signals and context processors
+        html = Markup(current_app.jinja_env.get_template(template_name).render(context))
+        cache.set(cache_key, html)
+    return html
+
+
+def init_fragments(app):
+    app.extensions['fragment_cache'] = LRUCache(app.config['FRAGMENT_CACHE_SIZE'])
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from flask import Response, abort, g, has_request_context, request, before_render_template, template_rendered
+from flask_login import current_user
+from sqlalchemy import event
+from models import db
+
+# Per-request SQL, template and latency instrumentation with a Prometheus text endpoint.
+# Metrics live in process memory, so each worker exposes its own series.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.slow_queries = defaultdict(int)
+        self.histograms = {
+            'lavisco_request_duration_seconds': ('Total request latency.', LATENCY_BUCKETS, {}),
+            'lavisco_request_sql_seconds': ('Time spent in SQL per request.', LATENCY_BUCKETS, {}),
+            'lavisco_request_sql_queries': ('SQL statements issued per request.', QUERY_COUNT_BUCKETS, {}),
+            'lavisco_request_template_seconds': ('Template rendering time per request.', LATENCY_BUCKETS, {}),
+        }
+
+    def observe(self, name, endpoint, value):
+        _, buckets, series = self.histograms[name]
+        with self._lock:
+            if endpoint not in series:
+                series[endpoint] = Histogram(buckets)
+            series[endpoint].observe(value)
+
+    def count_request(self, endpoint, method, status):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+
+    def count_slow_query(self, endpoint):
+        with self._lock:
+            self.slow_queries[endpoint] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append('# HELP lavisco_requests_total Requests handled.')
+            lines.append('# TYPE lavisco_requests_total counter')
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(f'lavisco_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+
+            lines.append('# HELP lavisco_slow_queries_total SQL statements slower than SLOW_QUERY_THRESHOLD_MS.')
+            lines.append('# TYPE lavisco_slow_queries_total counter')
+            for endpoint, value in sorted(self.slow_queries.items()):
+                lines.append(f'lavisco_slow_queries_total{{endpoint="{endpoint}"}} {value}')
+
+            for name, (help_text, buckets, series) in self.histograms.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for endpoint, histogram in sorted(series.items()):
+                    for bound, count in zip(buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.total:.6f}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def instrument_engine(app, engine):
+    """Count and time the engine's statements against the request that issued them."""
+    registry = app.extensions['metrics']
+    slow_threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        if not has_request_context():
+            return
+        stats = g.get('request_metrics')
+        if stats is None:
+            return
+        stats['sql_count'] += 1
+        stats['sql_time'] += elapsed
+        if stats['queries'] is not None:
+            stats['queries'].append((statement, elapsed))
+        if elapsed >= slow_threshold:
+            registry.count_slow_query(_endpoint())
+            app.logger.warning('Slow query (%.1f ms) on %s: %s', elapsed * 1000, _endpoint(), statement)
+
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('query_start'):
+            context.connection.info['query_start'].pop()
+
+    event.listen(engine, 'handle_error', handle_error)
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def init_metrics(app):
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+    with app.app_context():
+        instrument_engine(app, db.engine)
+
+    def template_started(sender, template, context, **extra):
+        stats = g.get('request_metrics')
+        if stats is not None:
+            stats['template_stack'].append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        stats = g.get('request_metrics')
+        if stats is not None and stats['template_stack']:
+            started = stats['template_stack'].pop()
+            if not stats['template_stack']:
+                stats['template_time'] += time.perf_counter() - started
+
+    # Strong references: these are closures that would otherwise be garbage collected
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+    @app.before_request
+    def start_request_metrics():
+        # SQL text is only ever sent back to signed-in users
+        wants_breakdown = (app.config['DEBUG_QUERY_HEADER'] and request.headers.get('X-Debug-Queries')
+                           and current_user.is_authenticated)
+        g.request_metrics = {
+            'start': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'template_time': 0.0,
+            'template_stack': [],
+            'queries': [] if wants_breakdown else None,
+        }
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop('request_metrics', None)
+        if stats is None or request.endpoint == 'metrics':
+            return response
+        endpoint = _endpoint()
+        elapsed = time.perf_counter() - stats['start']
+        registry.count_request(endpoint, request.method, response.status_code)
+        registry.observe('lavisco_request_duration_seconds', endpoint, elapsed)
+        registry.observe('lavisco_request_sql_seconds', endpoint, stats['sql_time'])
+        registry.observe('lavisco_request_sql_queries', endpoint, stats['sql_count'])
+        registry.observe('lavisco_request_template_seconds', endpoint, stats['template_time'])
+
+        if stats['queries'] is not None:
+            response.headers['X-Query-Count'] = str(stats['sql_count'])
+            response.headers['X-Query-Time-Ms'] = f'{stats["sql_time"] * 1000:.2f}'
+            response.headers['X-Template-Time-Ms'] = f'{stats["template_time"] * 1000:.2f}'
+            response.headers['X-Request-Time-Ms'] = f'{elapsed * 1000:.2f}'
+            # Identical statements are folded together so N+1 patterns stand out
+            breakdown = defaultdict(lambda: [0, 0.0])
+            for statement, query_time in stats['queries']:
+                entry = breakdown[' '.join(statement.split())[:200]]
+                entry[0] += 1
+                entry[1] += query_time
+            top = sorted(breakdown.items(), key=lambda item: item[1][1], reverse=True)[:20]
+            response.headers['X-Query-Breakdown'] = json.dumps([
+                {'sql': sql, 'count': count, 'ms': round(total * 1000, 2)} for sql, (count, total) in top
+            ])
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        # Closed by default: scrapers present METRICS_TOKEN, staff are signed in, and anonymous
+        # reads need METRICS_PUBLIC
+        token = app.config['METRICS_TOKEN']
+        scraper = bool(token) and request.headers.get('Authorization') == f'Bearer {token}'
+        if not (scraper or app.config['METRICS_PUBLIC'] or current_user.is_authenticated):
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
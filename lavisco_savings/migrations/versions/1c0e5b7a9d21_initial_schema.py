@@ -0,0 +1,66 @@
+"""initial schema
+
+Revision ID: 1c0e5b7a9d21
+Revises: 
+Create Date: 2026-10-16 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c0e5b7a9d21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by db.create_all() before migrations existed already have these
+    # tables, hence if_not_exists
+    op.create_table('user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=True),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('password_hash', sa.String(length=128), nullable=True),
+        sa.Column('full_name', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_user_email', 'user', ['email'], unique=True, if_not_exists=True)
+    op.create_index('ix_user_username', 'user', ['username'], unique=True, if_not_exists=True)
+    op.create_table('minister',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('full_name', sa.String(length=100), nullable=False),
+        sa.Column('department', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('date_joined', sa.Date(), nullable=True),
+        sa.Column('total_savings', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table('payment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('minister_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('week_number', sa.Integer(), nullable=True),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['minister_id'], ['minister.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('payment')
+    op.drop_table('minister')
+    op.drop_index('ix_user_username', table_name='user')
+    op.drop_index('ix_user_email', table_name='user')
+    op.drop_table('user')
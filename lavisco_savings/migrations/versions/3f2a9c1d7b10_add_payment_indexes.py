@@ -0,0 +1,32 @@
+"""add payment indexes
+
+Revision ID: 3f2a9c1d7b10
+Revises: 1c0e5b7a9d21
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b10'
+down_revision = '1c0e5b7a9d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables created by db.create_all() before migrations existed may already have these,
+    # hence if_not_exists
+    op.create_index('ix_payment_payment_date', 'payment', ['payment_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_payment_created_at', 'payment', ['created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_payment_minister_date', 'payment', ['minister_id', 'payment_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_minister_total_savings', 'minister', ['total_savings'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_minister_total_savings', table_name='minister')
+    op.drop_index('ix_payment_minister_date', table_name='payment')
+    op.drop_index('ix_payment_created_at', table_name='payment')
+    op.drop_index('ix_payment_payment_date', table_name='payment')
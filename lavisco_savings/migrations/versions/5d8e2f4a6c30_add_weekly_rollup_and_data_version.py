@@ -0,0 +1,44 @@
+"""add weekly rollup and data version
+
+Revision ID: 5d8e2f4a6c30
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-16 22:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2f4a6c30'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Until now db.create_all() made these at startup, so they may already exist
+    op.create_table('weekly_rollup',
+        sa.Column('minister_id', sa.Integer(), nullable=False),
+        sa.Column('iso_year', sa.Integer(), nullable=False),
+        sa.Column('iso_week', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['minister_id'], ['minister.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('minister_id', 'iso_year', 'iso_week'),
+        if_not_exists=True
+    )
+    op.create_index('ix_weekly_rollup_week_start', 'weekly_rollup', ['week_start'], unique=False, if_not_exists=True)
+    op.create_table('data_version',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('data_version')
+    op.drop_index('ix_weekly_rollup_week_start', table_name='weekly_rollup')
+    op.drop_table('weekly_rollup')
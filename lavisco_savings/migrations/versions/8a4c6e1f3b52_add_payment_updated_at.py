@@ -0,0 +1,27 @@
+"""add payment updated_at
+
+Revision ID: 8a4c6e1f3b52
+Revises: 5d8e2f4a6c30
+Create Date: 2026-10-16 23:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4c6e1f3b52'
+down_revision = '5d8e2f4a6c30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows stay NULL until their next edit; list rows are cached by this column
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
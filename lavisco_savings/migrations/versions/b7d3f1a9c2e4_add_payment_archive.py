@@ -0,0 +1,64 @@
+"""add payment archive
+
+Revision ID: b7d3f1a9c2e4
+Revises: 8a4c6e1f3b52
+Create Date: 2026-10-17 00:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3f1a9c2e4'
+down_revision = '8a4c6e1f3b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payment_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('minister_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('week_number', sa.Integer(), nullable=True),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['minister_id'], ['minister.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payment_archive_payment_date', 'payment_archive', ['payment_date'], unique=False)
+    op.create_index('ix_payment_archive_minister_date', 'payment_archive', ['minister_id', 'payment_date'], unique=False)
+    op.create_table('archived_year',
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('year')
+    )
+    op.create_table('carry_forward',
+        sa.Column('minister_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.Column('last_amount', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['minister_id'], ['minister.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('minister_id', 'year')
+    )
+    # Archived ids must never be handed out again, which SQLite only promises with AUTOINCREMENT
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('payment', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('payment', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
+    op.drop_table('carry_forward')
+    op.drop_table('archived_year')
+    op.drop_index('ix_payment_archive_minister_date', table_name='payment_archive')
+    op.drop_index('ix_payment_archive_payment_date', table_name='payment_archive')
+    op.drop_table('payment_archive')
@@ -1,9 +1,24 @@
-from datetime import datetime
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
-db = SQLAlchemy()
+# Engine that SELECTs are sent to inside reporting.use_reporting(); None means the primary
+reporting_engine = ContextVar('reporting_engine', default=None)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # Only plain reads are rerouted; flushes and every write stay on the primary
+        engine = reporting_engine.get()
+        if engine is not None and bind is None and not self._flushing and getattr(clause, 'is_select', False):
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -29,7 +44,7 @@ class Minister(db.Model):
     phone = db.Column(db.String(20))
     email = db.Column(db.String(120))
     date_joined = db.Column(db.Date, default=datetime.utcnow().date())
-    total_savings = db.Column(db.Float, default=0.0)
+    total_savings = db.Column(db.Float, default=0.0, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -37,21 +52,193 @@ class Minister(db.Model):
     payments = db.relationship('Payment', backref='minister', lazy='dynamic', cascade='all, delete-orphan')
     
     def update_total_savings(self):
+        # Archived years are read from the frozen carry-forward, so only the hot table is summed
         total = db.session.query(db.func.sum(Payment.amount)).filter_by(minister_id=self.id).scalar() or 0
-        self.total_savings = total
+        frozen = db.session.query(CarryForward.total_amount).filter(
+            CarryForward.minister_id == self.id, CarryForward.at_boundary()
+        ).scalar() or 0
+        self.total_savings = total + frozen
         db.session.commit()
     
+    @classmethod
+    def adjust_total_savings(cls, minister_id, delta):
+        # Atomic in-database increment; the caller commits it together with the payment change
+        if not delta:
+            return
+        db.session.execute(
+            db.update(cls)
+            .where(cls.id == minister_id)
+            .values(total_savings=db.func.coalesce(cls.total_savings, 0) + delta)
+            .execution_options(synchronize_session=False)
+        )
+    
     def __repr__(self):
         return f'<Minister {self.full_name}>'
 
 class Payment(db.Model):
+    # payment_date serves the list, report and rollup range scans (SQLite appends the rowid,
+    # so it also orders by (payment_date, id)); created_at serves the recent-payments query.
+    # AUTOINCREMENT keeps SQLite from handing out ids that now live in payment_archive.
+    __table_args__ = (
+        db.Index('ix_payment_minister_date', 'minister_id', 'payment_date'),
+        {'sqlite_autoincrement': True},
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     minister_id = db.Column(db.Integer, db.ForeignKey('minister.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
-    payment_date = db.Column(db.Date, default=datetime.utcnow().date())
+    payment_date = db.Column(db.Date, default=datetime.utcnow().date(), index=True)
     week_number = db.Column(db.Integer)
     note = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Payment {self.amount} for {self.minister.full_name}>'
+
+class PaymentArchive(db.Model):
+    # Payments from closed years, moved out of the payment table by `flask archive-payments`.
+    # Same columns and ids as payment, so the two can be read as one with UNION ALL.
+    __tablename__ = 'payment_archive'
+    __table_args__ = (
+        db.Index('ix_payment_archive_minister_date', 'minister_id', 'payment_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    minister_id = db.Column(db.Integer, db.ForeignKey('minister.id', ondelete='CASCADE'), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    payment_date = db.Column(db.Date, index=True)
+    week_number = db.Column(db.Integer)
+    note = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<PaymentArchive {self.amount} on {self.payment_date}>'
+
+class ArchivedYear(db.Model):
+    # One row per closed year that has been moved to payment_archive; years are archived oldest
+    # first, so everything before the year after the latest one is in the archive
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def boundary(cls):
+        # First day still kept in the payment table, or None while nothing is archived
+        year = db.session.query(db.func.max(cls.year)).scalar()
+        return None if year is None else date(year + 1, 1, 1)
+    
+    def __repr__(self):
+        return f'<ArchivedYear {self.year}>'
+
+class CarryForward(db.Model):
+    # Frozen per-minister savings up to the end of an archived year, so balances and totals
+    # never have to read the archive back; last_amount is the final archived payment, which
+    # the first statement line of the following year is compared against
+    __tablename__ = 'carry_forward'
+    
+    minister_id = db.Column(db.Integer, db.ForeignKey('minister.id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    last_amount = db.Column(db.Float)
+    
+    @classmethod
+    def at_boundary(cls):
+        # Rows for the latest archived year, i.e. everything that is no longer in payment
+        return cls.year == db.select(db.func.max(ArchivedYear.year)).scalar_subquery()
+    
+    def __repr__(self):
+        return f'<CarryForward {self.minister_id} {self.year}>'
+
+class WeeklyRollup(db.Model):
+    # Per-minister sums for one ISO week, kept in step with every payment write
+    minister_id = db.Column(db.Integer, db.ForeignKey('minister.id', ondelete='CASCADE'), primary_key=True)
+    iso_year = db.Column(db.Integer, primary_key=True)
+    iso_week = db.Column(db.Integer, primary_key=True)
+    week_start = db.Column(db.Date, nullable=False, index=True)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def week_of(payment_date):
+        iso_year, iso_week, weekday = payment_date.isocalendar()
+        return iso_year, iso_week, payment_date - timedelta(days=weekday - 1)
+    
+    @classmethod
+    def apply(cls, minister_id, payment_date, amount, count=1):
+        # Add (or with negative values, remove) payments from the minister's week
+        iso_year, iso_week, week_start = cls.week_of(payment_date)
+        key = (cls.minister_id == minister_id, cls.iso_year == iso_year, cls.iso_week == iso_week)
+        updated = db.session.execute(
+            db.update(cls).where(*key).values(
+                total_amount=cls.total_amount + amount,
+                payment_count=cls.payment_count + count
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated and count > 0:
+            db.session.execute(db.insert(cls).values(
+                minister_id=minister_id, iso_year=iso_year, iso_week=iso_week,
+                week_start=week_start, total_amount=amount, payment_count=count
+            ))
+        elif count < 0:
+            db.session.execute(db.delete(cls).where(*key, cls.payment_count <= 0))
+    
+    @classmethod
+    def rebuild(cls, batch_size=5000):
+        # Regenerate every row from the payment history; daily sums are folded into ISO weeks here
+        # because SQLite has no ISO week format
+        weeks = {}
+        # Archived payments keep their weeks, including ISO weeks that straddle the boundary
+        for table in (PaymentArchive, Payment):
+            result = db.session.execute(
+                db.select(table.minister_id, table.payment_date,
+                          db.func.sum(table.amount), db.func.count(table.id))
+                .where(table.payment_date.isnot(None))
+                .group_by(table.minister_id, table.payment_date)
+                .execution_options(yield_per=batch_size)
+            )
+            for minister_id, payment_date, amount, count in result:
+                iso_year, iso_week, week_start = cls.week_of(payment_date)
+                row = weeks.setdefault((minister_id, iso_year, iso_week), {
+                    'minister_id': minister_id, 'iso_year': iso_year, 'iso_week': iso_week,
+                    'week_start': week_start, 'total_amount': 0.0, 'payment_count': 0
+                })
+                row['total_amount'] += amount
+                row['payment_count'] += count
+        
+        db.session.execute(db.delete(cls))
+        rows = list(weeks.values())
+        for i in range(0, len(rows), batch_size):
+            db.session.execute(db.insert(cls), rows[i:i + batch_size])
+        return len(rows)
+    
+    def __repr__(self):
+        return f'<WeeklyRollup {self.minister_id} {self.iso_year}-W{self.iso_week:02d}>'
+
+class DataVersion(db.Model):
+    # Monotonic counter bumped whenever ministers or payments change; used as a cache key
+    name = db.Column(db.String(32), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def bump(cls, name='data'):
+        # Atomic increment inside the caller's transaction
+        updated = db.session.execute(
+            db.update(cls).where(cls.name == name).values(version=cls.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.add(cls(name=name, version=1))
+    
+    @classmethod
+    def current(cls, name='data'):
+        # Always read on the primary: cache keys and report job ids built from a lagging
+        # reporting copy would disagree between workers and name stale results as fresh
+        return db.session.execute(
+            db.select(cls.version).where(cls.name == name), bind_arguments={'bind': db.engine}
+        ).scalar() or 0
     
     def __repr__(self):
-        return f'<Payment {self.amount} for {self.minister.full_name}>'
\ No newline at end of file
+        return f'<DataVersion {self.name}={self.version}>'
@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import date, datetime
+from models import db
+
+
+def encode_cursor(values):
+    # Dates are stored as ISO strings so the cursor survives a round trip through the URL
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            return None
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        return None
+
+
+def _keyset_filter(columns, values, descending):
+    # Row-value comparison spelled out as (a < x) OR (a = x AND b < y) ... for portability
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(db.and_(*equal, beyond))
+    return db.or_(*clauses)
+
+
+class KeysetPage:
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, columns, after=None, before=None, per_page=50, with_total=True):
+    """Page through ``query`` newest-first on ``columns`` (the last one must be unique)."""
+    total = query.order_by(None).count() if with_total else None
+
+    after_values = decode_cursor(after, columns)
+    before_values = decode_cursor(before, columns) if after_values is None else None
+
+    if before_values is not None:
+        # Walk backwards from the cursor, then flip the rows back into display order
+        rows = (query.filter(_keyset_filter(columns, before_values, descending=False))
+                .order_by(*[c.asc() for c in columns])
+                .limit(per_page + 1).all())
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after_values is not None:
+            query = query.filter(_keyset_filter(columns, after_values, descending=True))
+        rows = query.order_by(*[c.desc() for c in columns]).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = after_values is not None
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, c.key) for c in columns])
+
+    return KeysetPage(
+        items,
+        per_page,
+        next_cursor=cursor_for(items[-1]) if has_next and items else None,
+        prev_cursor=cursor_for(items[0]) if has_prev and items else None,
+        total=total,
+    )
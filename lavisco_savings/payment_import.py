@@ -0,0 +1,185 @@
+import csv
+import io
+import math
+from collections import defaultdict
+from datetime import datetime
+from models import db, Minister, Payment, WeeklyRollup, ArchivedYear, DataVersion
+
+# Accepted header spellings for each field
+COLUMN_ALIASES = {
+    'minister': ('minister', 'minister_id', 'minister_name', 'name'),
+    'amount': ('amount',),
+    'date': ('date', 'payment_date'),
+    'week': ('week', 'week_number'),
+    'note': ('note', 'notes'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.total_amount = 0.0
+        self.errors = []
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _column_map(fieldnames):
+    normalized = {(name or '').strip().lower(): name for name in fieldnames or []}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized[alias]
+                break
+    return columns
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid date "{value}", expected YYYY-MM-DD or DD/MM/YYYY')
+
+
+def parse_amount(value):
+    # float() also accepts nan and inf, which no comparison with the minimum rejects
+    try:
+        amount = float(value.replace(',', ''))
+    except ValueError:
+        raise ValueError(f'Invalid amount "{value}"')
+    if not math.isfinite(amount) or amount < 0.01:
+        raise ValueError('Amount must be at least 0.01')
+    return amount
+
+
+def _resolve_ministers(references):
+    # One query for every id and name referenced in the file
+    ids = {int(ref) for ref in references if ref.isdigit()}
+    names = {ref.lower() for ref in references if not ref.isdigit()}
+    conditions = []
+    if ids:
+        conditions.append(Minister.id.in_(ids))
+    if names:
+        conditions.append(db.func.lower(Minister.full_name).in_(names))
+    if not conditions:
+        return {}, {}
+
+    by_id = {}
+    by_name = defaultdict(list)
+    for minister_id, full_name in db.session.execute(
+        db.select(Minister.id, Minister.full_name).where(db.or_(*conditions))
+    ):
+        by_id[minister_id] = full_name
+        by_name[full_name.lower()].append(minister_id)
+    return by_id, by_name
+
+
+def import_payments(stream, dry_run=False):
+    """Validate and insert payments from a CSV of minister/amount/date/week/note.
+
+    Good rows are inserted in a single transaction; bad rows are reported by line number.
+    """
+    result = ImportResult()
+    try:
+        if isinstance(stream, bytes):
+            stream = io.StringIO(stream.decode('utf-8-sig'))
+        reader = csv.DictReader(stream)
+        # Read up front so a bad byte anywhere is reported before anything is checked
+        records = list(enumerate(reader, start=2))
+    except UnicodeDecodeError:
+        result.error(1, 'The file is not UTF-8 encoded; save it as "CSV UTF-8" and try again')
+        return result
+    columns = _column_map(reader.fieldnames)
+    missing = [field for field in ('minister', 'amount', 'date') if field not in columns]
+    if missing:
+        result.error(1, f'Missing column(s): {", ".join(missing)}')
+        return result
+
+    def value(row, field):
+        return (row.get(columns[field]) or '').strip() if field in columns else ''
+
+    by_id, by_name = _resolve_ministers({value(row, 'minister') for _, row in records if value(row, 'minister')})
+
+    boundary = ArchivedYear.boundary()
+    payments = []
+    for line, row in records:
+        if not any((cell or '').strip() for cell in row.values() if isinstance(cell, str)):
+            continue
+        try:
+            reference = value(row, 'minister')
+            if not reference:
+                raise ValueError('Minister is required')
+            if reference.isdigit():
+                minister_id = int(reference)
+                if minister_id not in by_id:
+                    raise ValueError(f'No minister with id {minister_id}')
+            else:
+                matches = by_name.get(reference.lower(), [])
+                if not matches:
+                    raise ValueError(f'No minister named "{reference}"')
+                if len(matches) > 1:
+                    raise ValueError(f'Several ministers are named "{reference}", use the id instead')
+                minister_id = matches[0]
+
+            amount = parse_amount(value(row, 'amount'))
+
+            payment_date = _parse_date(value(row, 'date'))
+            if boundary is not None and payment_date < boundary:
+                raise ValueError(f'Payments before {boundary:%Y-%m-%d} are archived')
+
+            week = value(row, 'week')
+            if week:
+                if not week.isdigit() or int(week) < 1:
+                    raise ValueError(f'Invalid week number "{week}"')
+                week_number = int(week)
+            else:
+                # ISO week number
+                week_number = payment_date.isocalendar()[1]
+        except ValueError as e:
+            result.error(line, str(e))
+            continue
+
+        payments.append({
+            'minister_id': minister_id,
+            'amount': amount,
+            'payment_date': payment_date,
+            'week_number': week_number,
+            'note': value(row, 'note') or None,
+            'created_at': datetime.utcnow()
+        })
+
+    result.inserted = len(payments)
+    result.total_amount = sum(p['amount'] for p in payments)
+    if dry_run or not payments:
+        return result
+
+    record_payments(payments)
+    db.session.commit()
+    return result
+
+
+def record_payments(payments):
+    # executemany insert plus one total update per minister and one rollup update per week;
+    # the caller commits
+    db.session.execute(db.insert(Payment), payments)
+
+    minister_deltas = defaultdict(float)
+    week_deltas = defaultdict(lambda: [0.0, 0])
+    for payment in payments:
+        minister_deltas[payment['minister_id']] += payment['amount']
+        week = WeeklyRollup.week_of(payment['payment_date'])
+        delta = week_deltas[(payment['minister_id'], week)]
+        delta[0] += payment['amount']
+        delta[1] += 1
+
+    for minister_id, delta in minister_deltas.items():
+        Minister.adjust_total_savings(minister_id, delta)
+    for (minister_id, (_, _, week_start)), (amount, count) in week_deltas.items():
+        WeeklyRollup.apply(minister_id, week_start, amount, count)
+    DataVersion.bump()
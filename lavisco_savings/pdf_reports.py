@@ -0,0 +1,326 @@
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+# These builders only take plain Python data so they can run in a worker process
+
+
+def build_summary_pdf(output, start_date, end_date, total_amount, total_payments, minister_rows):
+    # minister_rows: (name, amount, count) tuples, largest contributors first
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    elements = []
+
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = styles['h1']
+    heading_style = styles['h2']
+    normal_style = styles['Normal']
+
+    # Add title
+    elements.append(Paragraph("Lavisco Ministers Saving Scheme - Summary Report", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Add date range
+    elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
+    elements.append(Spacer(1, 12))
+
+    # Add summary statistics
+    elements.append(Paragraph("Summary Statistics", heading_style))
+    elements.append(Spacer(1, 6))
+
+    summary_data = [
+        ['Total Amount', f'${total_amount:.2f}'],
+        ['Total Payments', str(total_payments)]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    elements.append(summary_table)
+    elements.append(Spacer(1, 12))
+
+    # Add minister totals
+    elements.append(Paragraph("Minister Contributions", heading_style))
+    elements.append(Spacer(1, 6))
+
+    minister_data = [['Minister Name', 'Total Amount', 'Number of Payments']]
+
+    for name, amount, count in minister_rows:
+        minister_data.append([
+            name,
+            f'${amount:.2f}',
+            str(count)
+        ])
+
+    minister_table = Table(minister_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
+    minister_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    elements.append(minister_table)
+
+    # Build PDF
+    doc.build(elements)
+
+
+# Shared by every chunk of the detailed report; built once per worker process
+DETAILED_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 8)
+])
+
+DETAILED_HEADER = ['Date', 'Minister Name', 'Amount', 'Week Number', 'Note']
+DETAILED_COL_WIDTHS = [1*inch, 2*inch, 1*inch, 1*inch, 2*inch]
+
+
+def _detailed_table(rows):
+    table = Table([DETAILED_HEADER] + rows, colWidths=DETAILED_COL_WIDTHS, repeatRows=1)
+    table.setStyle(DETAILED_TABLE_STYLE)
+    return table
+
+
+def build_detailed_pdf(output, start_date, end_date, payment_rows, chunk_rows):
+    # payment_rows: any iterable of (payment_date, minister name, amount, week_number, note)
+    # tuples, consumed once. Rows go into tables of chunk_rows each: splitting one huge table
+    # across pages is far slower than laying out many page-sized ones.
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    elements = []
+
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = styles['h1']
+    heading_style = styles['h2']
+    normal_style = styles['Normal']
+
+    # Add title
+    elements.append(Paragraph("Lavisco Ministers Saving Scheme - Detailed Report", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Add date range
+    elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
+    elements.append(Spacer(1, 12))
+
+    # Add payment details
+    elements.append(Paragraph("Payment Details", heading_style))
+    elements.append(Spacer(1, 6))
+
+    chunk = []
+    tables = 0
+    for payment_date, name, amount, week_number, note in payment_rows:
+        chunk.append([
+            payment_date.strftime('%Y-%m-%d'),
+            name,
+            f'${amount:.2f}',
+            str(week_number) if week_number else '',
+            note or ''
+        ])
+        if len(chunk) >= chunk_rows:
+            elements.append(_detailed_table(chunk))
+            tables += 1
+            chunk = []
+    if chunk or not tables:
+        elements.append(_detailed_table(chunk))
+
+    # Build PDF
+    doc.build(elements)
+
+
+def build_analytics_pdf(output, start_date, end_date, analytics):
+    # analytics: the plain dict from analytics.savings_analytics
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    elements = []
+
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = styles['h1']
+    heading_style = styles['h2']
+    normal_style = styles['Normal']
+
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8)
+    ])
+
+    # Add title
+    elements.append(Paragraph("Lavisco Ministers Saving Scheme - Analytics Report", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Add date range
+    elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
+    elements.append(Spacer(1, 12))
+
+    # Add range statistics
+    elements.append(Paragraph("Summary Statistics", heading_style))
+    elements.append(Spacer(1, 6))
+
+    projection = analytics['projection']
+    summary_data = [
+        ['Measure', 'Value'],
+        ['Total Amount', f'${analytics["total_amount"]:.2f}'],
+        ['Total Payments', str(analytics['total_payments'])],
+        ['Weekly Trend', f'{analytics["trend"]["slope_per_week"]:+.2f} per week'],
+    ]
+    for name, value in analytics['payment_percentiles'].items():
+        summary_data.append([f'Payment {name}', f'${value:.2f}'])
+    summary_data += [
+        [f'{projection["year"]} Year to Date', f'${projection["year_to_date"]:.2f}'],
+        [f'{projection["year"]} Projected Total', f'${projection["projected_total"]:.2f}'],
+        ['Sundays Remaining', str(projection['remaining_sundays'])],
+    ]
+    summary_table = Table(summary_data, colWidths=[2.5*inch, 2*inch])
+    summary_table.setStyle(table_style)
+    elements.append(summary_table)
+    elements.append(Spacer(1, 12))
+
+    # Add the weekly trend
+    elements.append(Paragraph("Weekly Totals", heading_style))
+    elements.append(Spacer(1, 6))
+
+    week_data = [['Week Starting', 'Total', 'Payments', 'Moving Average']]
+    for week in analytics['weeks']:
+        average = week['moving_average']
+        week_data.append([week['week_start'], f'${week["total"]:.2f}', str(week['payments']),
+                          '' if average is None else f'${average:.2f}'])
+    week_table = Table(week_data, colWidths=[1.5*inch, 1.5*inch, 1*inch, 1.5*inch], repeatRows=1)
+    week_table.setStyle(table_style)
+    elements.append(week_table)
+    elements.append(Spacer(1, 12))
+
+    # Add per-minister consistency and projections
+    elements.append(Paragraph("Minister Analytics", heading_style))
+    elements.append(Spacer(1, 6))
+
+    minister_data = [['Minister Name', 'Total', 'Paid', 'Missed', 'Consistency', 'Projected Year End']]
+    for row in analytics['ministers']:
+        minister_data.append([row['full_name'], f'${row["total"]:.2f}', str(row['sundays_paid']),
+                              str(row['sundays_missed']), f'{row["consistency"]:.0%}',
+                              f'${row["projected_year_end"]:.2f}'])
+    minister_table = Table(minister_data, colWidths=[2*inch, 1.2*inch, 0.6*inch, 0.7*inch, 0.9*inch, 1.3*inch],
+                           repeatRows=1)
+    minister_table.setStyle(table_style)
+    elements.append(minister_table)
+
+    # Build PDF
+    doc.build(elements)
+
+
+STATEMENT_HEADER = ['Date', 'Week', 'Amount', 'Change', 'Balance', 'Note']
+STATEMENT_COL_WIDTHS = [1*inch, 0.6*inch, 1.1*inch, 1*inch, 1.3*inch, 2*inch]
+
+
+def _statement_table(rows, subtotal_rows):
+    table = Table([STATEMENT_HEADER] + rows, colWidths=STATEMENT_COL_WIDTHS, repeatRows=1)
+    highlights = []
+    for i in subtotal_rows:
+        highlights.append(('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold'))
+        highlights.append(('BACKGROUND', (0, i), (-1, i), colors.lightgrey))
+    table.setStyle(TableStyle(highlights, parent=DETAILED_TABLE_STYLE))
+    return table
+
+
+def build_statement_pdf(output, start_date, end_date, full_name, opening_balance, statement_rows, chunk_rows):
+    # statement_rows: statement tuples in statements.STATEMENT_COLUMNS order, for one minister
+    from statements import with_subtotals
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    elements = []
+
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = styles['h1']
+    heading_style = styles['h2']
+    normal_style = styles['Normal']
+
+    # Add title
+    elements.append(Paragraph("Lavisco Ministers Saving Scheme - Minister Statement", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Add minister and date range
+    elements.append(Paragraph(f"Minister: {full_name}", normal_style))
+    elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
+    elements.append(Spacer(1, 12))
+
+    closing_balance = statement_rows[-1][5] if statement_rows else opening_balance
+    balance_table = Table([
+        ['Opening Balance', f'UGX{opening_balance:.2f}'],
+        ['Saved in Period', f'UGX{closing_balance - opening_balance:.2f}'],
+        ['Closing Balance', f'UGX{closing_balance:.2f}']
+    ], colWidths=[2*inch, 2*inch])
+    balance_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(balance_table)
+    elements.append(Spacer(1, 12))
+
+    # Add payment lines with monthly subtotals
+    elements.append(Paragraph("Payments", heading_style))
+    elements.append(Spacer(1, 6))
+
+    chunk = []
+    subtotal_rows = []
+    tables = 0
+    for kind, row in with_subtotals(statement_rows):
+        if kind == 'subtotal':
+            year, month, total = row
+            chunk.append([f'{year}-{month:02d}', '', f'UGX{total:.2f}', '', 'Month subtotal', ''])
+            subtotal_rows.append(len(chunk))
+        else:
+            chunk.append([
+                row[1].strftime('%Y-%m-%d'),
+                str(row[3]) if row[3] else '',
+                f'UGX{row[2]:.2f}',
+                '' if row[6] is None else f'{row[6]:+.2f}',
+                f'UGX{row[5]:.2f}',
+                row[4] or ''
+            ])
+        if len(chunk) >= chunk_rows:
+            elements.append(_statement_table(chunk, subtotal_rows))
+            tables += 1
+            chunk = []
+            subtotal_rows = []
+    if chunk or not tables:
+        elements.append(_statement_table(chunk, subtotal_rows))
+
+    # Build PDF
+    doc.build(elements)
+
+
+BUILDERS = {
+    'summary': build_summary_pdf,
+    'detailed': build_detailed_pdf,
+    'analytics': build_analytics_pdf,
+    'statement': build_statement_pdf,
+}
@@ -0,0 +1,107 @@
+import re
+import shutil
+import tempfile
+from datetime import date
+from sqlalchemy import event
+from models import db, Minister
+from seed_data import generate, scratch_app, login_client
+
+# Drives the hot pages and model helpers against a freshly seeded SQLite database, records
+# every SELECT they issue, and runs EXPLAIN QUERY PLAN on each one. A plain "SCAN payment"
+# (no index at all) means that access path would read the whole payment table.
+
+WATCHED_TABLES = ('payment', 'payment_archive')
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def _expect(response, statuses=(200, 302)):
+    # A hot route that fails issues no queries, which would otherwise pass as "no scans"
+    if response.status_code not in statuses:
+        request = response.request
+        raise RuntimeError(f'{request.method} {request.full_path.rstrip("?")} returned {response.status_code}')
+    # Streaming responses only run their queries when the body is read
+    return response.get_data(as_text=True)
+
+
+def _exercise(app, client):
+    # Every request below maps to a hot path in routes.py; the model helpers follow
+    _expect(client.get('/dashboard'))
+    _expect(client.get('/payments'))
+    _expect(client.get('/payments?start_date=2024-03-01&end_date=2024-06-30&total=0'))
+    page = _expect(client.get('/payments?per_page=20'))
+    cursor = re.search(r'after=([^&"]+)', page)
+    if cursor:
+        _expect(client.get(f'/payments?per_page=20&after={cursor.group(1)}'))
+    _expect(client.get('/ministers/lookup?q=Grace'))
+    for report_type in ('summary', 'detailed'):
+        for start, end in (('2024-02-01', '2024-05-15'), ('2024-03-04', '2024-04-28')):
+            _expect(client.post(f'/reports/generate/{report_type}', data={'start_date': start, 'end_date': end}))
+    _expect(client.get('/payments/edit/1'))
+    _expect(client.get('/ministers/1/statement?start_date=2024-06-01&end_date=2025-02-28'))
+
+    minister = Minister.query.first()
+    minister.update_total_savings()
+    from commands import reconcile_total_savings
+    reconcile_total_savings(fix=False)
+
+    # With 2024 archived, ranges reaching back before 2025 read payment_archive as well
+    from archive import archive_year
+    archive_year(2024)
+    _expect(client.get('/dashboard'))
+    _expect(client.post('/reports/generate/detailed', data={'start_date': '2024-12-01', 'end_date': '2025-01-31'}))
+    _expect(client.get('/ministers/1/statement?start_date=2024-06-01&end_date=2025-02-28'))
+    _expect(client.get('/ministers/1/statement?start_date=2025-01-05&end_date=2025-02-28'))
+    _expect(client.get('/api/v1/payments?start_date=2024-12-01'))
+    minister.update_total_savings()
+    reconcile_total_savings(fix=False)
+
+
+def full_scans(conn, statement, parameters=()):
+    """Return the EXPLAIN QUERY PLAN lines if the statement fully scans a watched table, else []."""
+    plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+    for line in plan:
+        match = FULL_SCAN.match(line.strip())
+        if match and match.group(1) in WATCHED_TABLES:
+            return plan
+    return []
+
+
+def check_query_plans(config_class):
+    """Return ([(sql, plan lines), ...], queries checked) for queries that fully scan a watched table."""
+    workdir = tempfile.mkdtemp(prefix='lavisco-plans-')
+    try:
+        return run_checks(scratch_app(config_class, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_checks(app):
+    """Seed app's empty database, drive the hot paths and explain every SELECT they issued."""
+    statements = []
+    failures = []
+    with app.app_context():
+        generate(ministers=40, payments=2000, seed=7, end_date=date(2025, 2, 28))
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and not executemany:
+                statements.append((statement, parameters))
+
+        client = login_client(app)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            with app.test_request_context():
+                _exercise(app, client)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        seen = set()
+        with db.engine.connect() as conn:
+            for statement, parameters in statements:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = full_scans(conn, statement, parameters)
+                if plan:
+                    failures.append((statement, plan))
+    return failures, len(seen)
@@ -0,0 +1,370 @@
+import functools
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from werkzeug.utils import secure_filename
+from models import Minister, DataVersion
+from aggregates import payment_rows, payment_summary
+
+JOB_ID_PATTERN = re.compile(r'^(summary|detailed|analytics|statements|statement-\d+)_(\d{8})_to_(\d{8})_v(\d+)$')
+
+# The statement batch is a zip of one PDF per minister; everything else is a single PDF
+ARTIFACT_TYPES = {'statements': ('zip', 'application/zip')}
+DEFAULT_ARTIFACT_TYPE = ('pdf', 'application/pdf')
+
+# Seconds between checks while waiting on a job another worker is rendering
+JOB_POLL_INTERVAL = 0.25
+
+_executor = None
+_executor_lock = threading.Lock()
+# Coordinates statement batches in the web process while the pages render in the pool
+_batch_executor = ThreadPoolExecutor(max_workers=1)
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=current_app.config['REPORT_JOB_WORKERS'])
+        return _executor
+
+
+def cache_dir():
+    path = current_app.config['REPORT_CACHE_DIR'] or os.path.join(current_app.instance_path, 'report_cache')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def job_id_for(report_type, start_date, end_date, version=None):
+    # Same report type, range and data version always maps to the same cached file
+    if version is None:
+        version = DataVersion.current()
+    return f'{report_type}_{start_date:%Y%m%d}_to_{end_date:%Y%m%d}_v{version}'
+
+
+def _artifact_type(job_id):
+    return ARTIFACT_TYPES.get(JOB_ID_PATTERN.match(job_id).group(1), DEFAULT_ARTIFACT_TYPE)
+
+
+def artifact_path(job_id):
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    return os.path.join(cache_dir(), f'{job_id}.{_artifact_type(job_id)[0]}')
+
+
+def mimetype(job_id):
+    return _artifact_type(job_id)[1]
+
+
+def download_name(job_id):
+    report_type, start_str, end_str, _ = JOB_ID_PATTERN.match(job_id).groups()
+    return f'{report_type}_report_{start_str}_to_{end_str}.{_artifact_type(job_id)[0]}'
+
+
+class RowSpool:
+    """Report rows written to a temp file in pickled batches.
+
+    Large ranges are streamed from the database into the file and back out in the worker,
+    so neither process holds every row and the rows are not pickled as one huge argument.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def write(cls, rows, directory, batch_size):
+        fd, path = tempfile.mkstemp(suffix='.rows', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            batch = []
+            for row in rows:
+                batch.append(tuple(row))
+                if len(batch) >= batch_size:
+                    pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return cls(path)
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _render_to_file(report_type, path, args):
+    # Runs in the worker process; write to a temp name so readers never see a half-written file
+    from pdf_reports import BUILDERS
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        # statement-<minister id> jobs share the one statement builder
+        BUILDERS[report_type.split('-')[0]](tmp_path, *args)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        for arg in args:
+            if isinstance(arg, RowSpool):
+                arg.remove()
+    return path
+
+
+def _builder_args(report_type, start_date, end_date):
+    # Queries run here, in the web process; only plain data is shipped to the renderer
+    if report_type == 'summary':
+        summary = payment_summary(start_date, end_date)
+        return (start_date, end_date, summary.total_amount, summary.total_payments,
+                [(row.name, row.amount, row.count) for row in summary.ministers])
+    if report_type == 'analytics':
+        from analytics import report_analytics
+        return (start_date, end_date, report_analytics(start_date, end_date))
+    if report_type.startswith('statement-'):
+        from statements import minister_statement
+        minister = Minister.query.get_or_404(int(report_type.split('-')[1]))
+        statement = minister_statement(minister, start_date, end_date)
+        return (start_date, end_date, statement.full_name, statement.opening_balance, statement.rows,
+                current_app.config['PDF_TABLE_CHUNK_ROWS'])
+    batch_size = current_app.config['CSV_EXPORT_BATCH_SIZE']
+    spool = RowSpool.write(payment_rows(start_date, end_date, batch_size), cache_dir(), batch_size)
+    return (start_date, end_date, spool, current_app.config['PDF_TABLE_CHUNK_ROWS'])
+
+
+def _render_statement_batch(app, path, start_date, end_date):
+    """Render every minister's statement across the worker pool and zip the PDFs.
+
+    Runs on the batch thread. Rows are streamed from one window query and each minister is
+    handed to the pool as soon as their rows are read; at most two statements per worker
+    wait in the queue, so memory stays flat however many ministers there are.
+    """
+    from statements import all_statements
+    from reporting import use_reporting
+    with app.app_context(), use_reporting():
+        executor = _get_executor()
+        chunk_rows = app.config['PDF_TABLE_CHUNK_ROWS']
+        queued = threading.BoundedSemaphore(app.config['REPORT_JOB_WORKERS'] * 2)
+        workdir = tempfile.mkdtemp(suffix='.statements', dir=cache_dir())
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        renders = []
+        try:
+            for statement in all_statements(start_date, end_date, app.config['CSV_EXPORT_BATCH_SIZE']):
+                name = secure_filename(f'{statement.minister_id}_{statement.full_name}') + '.pdf'
+                args = (start_date, end_date, statement.full_name, statement.opening_balance,
+                        statement.rows, chunk_rows)
+                queued.acquire()
+                future = executor.submit(_render_to_file, 'statement', os.path.join(workdir, name), args)
+                future.add_done_callback(lambda _: queued.release())
+                renders.append((name, future))
+
+            # PDF page streams are already compressed, so the archive only stores them
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as archive:
+                for name, future in renders:
+                    archive.write(future.result(), name)
+            os.replace(tmp_path, path)
+        finally:
+            for _, future in renders:
+                future.cancel()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return path
+
+
+def _prune_stale(job_id):
+    # Older data versions of the same report can never be served again
+    prefix = job_id.rsplit('_v', 1)[0] + '_v'
+    artifact = os.path.basename(artifact_path(job_id))
+    directory = cache_dir()
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and not name.endswith('.tmp') and not name.startswith(artifact):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+# Job state is shared between web workers through a marker file next to the artifact. It is
+# created exclusively by the worker that renders the job, removed once the artifact is in
+# place and rewritten with the error if rendering fails, so a status poll or a repeat
+# request that lands on another worker sees the same job instead of starting it again.
+
+def _marker_path(path):
+    return f'{path}.job'
+
+
+def _read_marker(marker):
+    """The job's shared state, or None when no live job owns the marker."""
+    try:
+        age = time.time() - os.path.getmtime(marker)
+        with open(marker) as f:
+            content = f.read()
+    except OSError:
+        return None
+    try:
+        state = json.loads(content)
+    except ValueError:
+        # Caught between its creation and the first write
+        state = {'status': 'running'}
+    # A worker that died mid-render never clears its marker
+    if state.get('status') != 'failed' and age > current_app.config['REPORT_JOB_TIMEOUT']:
+        return None
+    return state
+
+
+def _claim(marker):
+    """Create the marker for this process; False if a live job elsewhere already owns it."""
+    for _ in range(2):
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            state = _read_marker(marker)
+            if state is not None and state.get('status') != 'failed':
+                return False
+            # Failed or abandoned: take the job over
+            try:
+                os.remove(marker)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'status': 'running', 'pid': os.getpid()}, f)
+        return True
+    return False
+
+
+def _release(marker, error=None):
+    try:
+        if error is None:
+            os.remove(marker)
+            return
+        tmp_path = f'{marker}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'status': 'failed', 'error': error}, f)
+        os.replace(tmp_path, marker)
+    except OSError:
+        pass
+
+
+def _job_finished(marker, future):
+    if future.cancelled():
+        _release(marker, 'Report job was cancelled')
+    elif future.exception() is not None:
+        _release(marker, str(future.exception()))
+    else:
+        _release(marker)
+
+
+def submit(report_type, start_date, end_date):
+    job_id = job_id_for(report_type, start_date, end_date)
+    path = artifact_path(job_id)
+    if os.path.exists(path):
+        return job_id
+
+    with _jobs_lock:
+        # Forget finished jobs; their artifacts are on disk now
+        for finished in [k for k, f in _jobs.items() if f.done() and f.exception() is None]:
+            del _jobs[finished]
+        future = _jobs.get(job_id)
+        if future is not None and not future.done():
+            return job_id
+        _prune_stale(job_id)
+
+    marker = _marker_path(path)
+    if not _claim(marker):
+        # Already being rendered by another request or worker
+        return job_id
+
+    args = ()
+    try:
+        if report_type == 'statements':
+            # The batch thread reads the rows itself and fans the ministers out over the pool
+            executor = _batch_executor
+            work = (_render_statement_batch, current_app._get_current_object(), path, start_date, end_date)
+        else:
+            args = _builder_args(report_type, start_date, end_date)
+            executor = _get_executor()
+            work = (_render_to_file, report_type, path, args)
+        with _jobs_lock:
+            future = _jobs[job_id] = executor.submit(*work)
+    except BaseException as e:
+        for arg in args:
+            if isinstance(arg, RowSpool):
+                arg.remove()
+        _release(marker, str(e) or e.__class__.__name__)
+        raise
+    future.add_done_callback(functools.partial(_job_finished, marker))
+    return job_id
+
+
+def status(job_id):
+    path = artifact_path(job_id)
+    if path is None:
+        return None
+    if os.path.exists(path):
+        return {'job_id': job_id, 'status': 'done'}
+
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+    if future is None:
+        # Not ours; another worker may be rendering it
+        state = _read_marker(_marker_path(path))
+        if state is None:
+            return None
+        if state.get('status') == 'failed':
+            return {'job_id': job_id, 'status': 'failed', 'error': state.get('error')}
+        return {'job_id': job_id, 'status': 'running'}
+    if not future.done():
+        return {'job_id': job_id, 'status': 'running' if future.running() else 'queued'}
+    if future.exception() is not None:
+        return {'job_id': job_id, 'status': 'failed', 'error': str(future.exception())}
+    return {'job_id': job_id, 'status': 'done'}
+
+
+def render_now(report_type, start_date, end_date, timeout=None):
+    """Wait for the report and return its job id.
+
+    Synchronous path for the plain form post and the CLI: reuse the cache, otherwise wait for
+    the pool. Raises RuntimeError when the job fails and TimeoutError when it is still running
+    after timeout seconds (REPORT_JOB_TIMEOUT by default); the job itself carries on.
+    """
+    job_id = submit(report_type, start_date, end_date)
+    if timeout is None:
+        timeout = current_app.config['REPORT_JOB_TIMEOUT']
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+    if future is not None:
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeout:
+            raise TimeoutError(f'Report job {job_id} did not finish within {timeout}s') from None
+        except Exception as e:
+            raise RuntimeError(f'Report job {job_id} failed: {e}') from e
+        return job_id
+
+    # Rendered by another worker: wait for its artifact
+    deadline = time.monotonic() + timeout
+    while True:
+        job = status(job_id)
+        if job is None or job['status'] == 'failed':
+            raise RuntimeError(f'Report job {job_id} failed: {(job or {}).get("error", "abandoned")}')
+        if job['status'] == 'done':
+            return job_id
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Report job {job_id} did not finish within {timeout}s')
+        time.sleep(JOB_POLL_INTERVAL)
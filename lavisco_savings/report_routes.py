@@ -0,0 +1,211 @@
+from datetime import datetime, date
+from flask import render_template, redirect, url_for, flash, jsonify, send_file, request
+from flask_login import login_required
+from models import Minister
+from forms import ReportForm
+from csv_export import csv_response, detailed_report_rows, summary_report_rows, analytics_report_rows
+from statements import minister_statement, statement_csv_rows
+from reporting import reporting_view
+import report_jobs
+
+# Report pages, CSV exports and PDF jobs. ReportLab and NumPy are only imported by the
+# code paths that build a PDF or run the analytics, so neither is loaded at startup.
+
+def init_report_routes(app):
+    @app.route('/reports')
+    @login_required
+    def reports():
+        form = ReportForm()
+        return render_template('reports.html', title='Reports', form=form)
+    
+    @app.route('/reports/generate/<report_type>', methods=['POST'])
+    @login_required
+    @reporting_view
+    def generate_report(report_type):
+        form = ReportForm()
+        if not form.validate_on_submit():
+            flash('Invalid date range provided', 'danger')
+            return redirect(url_for('reports'))
+        
+        start_date = form.start_date.data
+        end_date = form.end_date.data
+        
+        # Format dates for filename
+        start_str = start_date.strftime('%Y%m%d')
+        end_str = end_date.strftime('%Y%m%d')
+        
+        if report_type == 'summary':
+            return generate_summary_report(start_date, end_date, start_str, end_str)
+        elif report_type == 'detailed':
+            return generate_detailed_report(start_date, end_date, start_str, end_str)
+        elif report_type == 'analytics':
+            return generate_analytics_report(start_date, end_date, start_str, end_str)
+        else:
+            flash('Invalid report type', 'danger')
+            return redirect(url_for('reports'))
+    
+    def generate_summary_report(start_date, end_date, start_str, end_str):
+        rows = summary_report_rows(start_date, end_date)
+        return csv_response(rows, f'summary_report_{start_str}_to_{end_str}.csv',
+                            streaming=app.config['CSV_EXPORT_STREAMING'],
+                            batch_size=app.config['CSV_EXPORT_BATCH_SIZE'])
+    
+    def generate_detailed_report(start_date, end_date, start_str, end_str):
+        rows = detailed_report_rows(start_date, end_date, app.config['CSV_EXPORT_BATCH_SIZE'])
+        return csv_response(rows, f'detailed_report_{start_str}_to_{end_str}.csv',
+                            streaming=app.config['CSV_EXPORT_STREAMING'],
+                            batch_size=app.config['CSV_EXPORT_BATCH_SIZE'])
+    
+    def generate_analytics_report(start_date, end_date, start_str, end_str):
+        rows = analytics_report_rows(start_date, end_date)
+        return csv_response(rows, f'analytics_report_{start_str}_to_{end_str}.csv',
+                            streaming=app.config['CSV_EXPORT_STREAMING'],
+                            batch_size=app.config['CSV_EXPORT_BATCH_SIZE'])
+    
+    @app.route('/reports/pdf/<report_type>', methods=['POST'])
+    @login_required
+    @reporting_view
+    def generate_pdf_report(report_type):
+        form = ReportForm()
+        if not form.validate_on_submit():
+            flash('Invalid date range provided', 'danger')
+            return redirect(url_for('reports'))
+        
+        start_date = form.start_date.data
+        end_date = form.end_date.data
+        
+        # Format dates for filename
+        start_str = start_date.strftime('%Y%m%d')
+        end_str = end_date.strftime('%Y%m%d')
+        
+        if report_type == 'summary':
+            return generate_summary_pdf(start_date, end_date, start_str, end_str)
+        elif report_type == 'detailed':
+            return generate_detailed_pdf(start_date, end_date, start_str, end_str)
+        elif report_type == 'analytics':
+            return generate_analytics_pdf(start_date, end_date, start_str, end_str)
+        else:
+            flash('Invalid report type', 'danger')
+            return redirect(url_for('reports'))
+    
+    def generate_summary_pdf(start_date, end_date, start_str, end_str):
+        return render_report('summary', start_date, end_date, url_for('reports'))
+    
+    def generate_detailed_pdf(start_date, end_date, start_str, end_str):
+        return render_report('detailed', start_date, end_date, url_for('reports'))
+    
+    def generate_analytics_pdf(start_date, end_date, start_str, end_str):
+        return render_report('analytics', start_date, end_date, url_for('reports'))
+    
+    def render_report(report_type, start_date, end_date, back_url):
+        # A slow or failed render goes back to the page it came from rather than a 500
+        try:
+            job_id = report_jobs.render_now(report_type, start_date, end_date)
+        except TimeoutError:
+            flash('The report is still being generated. Please try again in a few minutes.', 'warning')
+            return redirect(back_url)
+        except RuntimeError:
+            app.logger.exception('Generating the %s report failed', report_type)
+            flash('The report could not be generated. Please try again.', 'danger')
+            return redirect(back_url)
+        return send_report_artifact(job_id)
+    
+    def send_report_artifact(job_id):
+        return send_file(report_jobs.artifact_path(job_id), mimetype=report_jobs.mimetype(job_id),
+                         as_attachment=True, download_name=report_jobs.download_name(job_id))
+    
+    @app.route('/reports/jobs/<report_type>', methods=['POST'])
+    @login_required
+    @reporting_view
+    def submit_report_job(report_type):
+        form = ReportForm()
+        if report_type not in ('summary', 'detailed', 'analytics', 'statements'):
+            return jsonify({'error': 'Invalid report type'}), 400
+        if not form.validate_on_submit():
+            return jsonify({'error': 'Invalid date range provided'}), 400
+        
+        job_id = report_jobs.submit(report_type, form.start_date.data, form.end_date.data)
+        job = report_jobs.status(job_id)
+        if job is None:
+            # The artifact was pruned or the job abandoned in between; start it again
+            job_id = report_jobs.submit(report_type, form.start_date.data, form.end_date.data)
+            job = report_jobs.status(job_id) or {'job_id': job_id, 'status': 'queued'}
+        job['status_url'] = url_for('report_job_status', job_id=job_id)
+        job['download_url'] = url_for('download_report_job', job_id=job_id)
+        return jsonify(job), 202
+    
+    @app.route('/reports/jobs/<job_id>')
+    @login_required
+    def report_job_status(job_id):
+        job = report_jobs.status(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown report job'}), 404
+        job['download_url'] = url_for('download_report_job', job_id=job_id)
+        return jsonify(job)
+    
+    @app.route('/reports/jobs/<job_id>/download')
+    @login_required
+    def download_report_job(job_id):
+        job = report_jobs.status(job_id)
+        if job is None or job['status'] != 'done':
+            return jsonify({'error': 'Report is not ready'}), 404
+        return send_report_artifact(job_id)
+    
+    def statement_range():
+        # Defaults to the year so far; the opening balance carries everything before it
+        today = date.today()
+        try:
+            start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() \
+                if request.args.get('start_date') else date(today.year, 1, 1)
+            end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() \
+                if request.args.get('end_date') else today
+        except ValueError:
+            flash('Invalid date range provided', 'danger')
+            return date(today.year, 1, 1), today
+        if start_date > end_date:
+            flash('Start date must not be after end date', 'danger')
+            return end_date, end_date
+        return start_date, end_date
+    
+    @app.route('/ministers/<int:id>/statement')
+    @login_required
+    @reporting_view
+    def minister_statement_view(id):
+        minister = Minister.query.get_or_404(id)
+        start_date, end_date = statement_range()
+        statement = minister_statement(minister, start_date, end_date)
+        return render_template('statement.html', title=f'Statement - {minister.full_name}',
+                               minister=minister, statement=statement)
+    
+    @app.route('/ministers/<int:id>/statement/csv')
+    @login_required
+    @reporting_view
+    def minister_statement_csv(id):
+        minister = Minister.query.get_or_404(id)
+        start_date, end_date = statement_range()
+        statement = minister_statement(minister, start_date, end_date)
+        return csv_response(statement_csv_rows(statement),
+                            f'statement_{minister.id}_{start_date:%Y%m%d}_to_{end_date:%Y%m%d}.csv',
+                            streaming=app.config['CSV_EXPORT_STREAMING'],
+                            batch_size=app.config['CSV_EXPORT_BATCH_SIZE'])
+    
+    @app.route('/ministers/<int:id>/statement/pdf')
+    @login_required
+    @reporting_view
+    def minister_statement_pdf(id):
+        minister = Minister.query.get_or_404(id)
+        start_date, end_date = statement_range()
+        return render_report(f'statement-{minister.id}', start_date, end_date,
+                             url_for('minister_statement_view', id=minister.id,
+                                     start_date=start_date.isoformat(), end_date=end_date.isoformat()))
+    
+    @app.route('/reports/statements', methods=['POST'])
+    @login_required
+    @reporting_view
+    def generate_statements():
+        # Every minister's statement as one zip; the PDFs render in parallel in the worker pool
+        form = ReportForm()
+        if not form.validate_on_submit():
+            flash('Invalid date range provided', 'danger')
+            return redirect(url_for('reports'))
+        return render_report('statements', form.start_date.data, form.end_date.data, url_for('reports'))
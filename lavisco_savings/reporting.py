@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, request
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from models import db, reporting_engine, DataVersion
+from database import database_profile
+from metrics import instrument_engine
+
+# Report, export and dashboard reads run against a reporting copy of the database, so a
+# multi-year export never competes with Sunday data entry for the primary. The copy is either
+# a replica named by REPORTING_DATABASE_URL or a snapshot of the SQLite file taken with the
+# backup API. Reads fall back to the primary whenever the copy is missing or has been behind
+# for longer than REPORTING_MAX_STALENESS seconds.
+
+
+def _data_version(engine):
+    with engine.connect() as conn:
+        return conn.execute(db.select(DataVersion.version).where(DataVersion.name == 'data')).scalar() or 0
+
+
+class SnapshotSource:
+    """Copy of the primary SQLite file, refreshed in the background once it falls behind.
+
+    The file's mtime is when the copy started, so every worker on the host shares one
+    snapshot and agrees on its age.
+    """
+
+    def __init__(self, app, primary_path, path, max_staleness):
+        self.app = app
+        self.primary_path = primary_path
+        self.path = path
+        self.max_staleness = max_staleness
+        self.busy_timeout = app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000
+        # A new connection per checkout, so a replaced snapshot is picked up straight away
+        self.engine = create_engine(f'sqlite:///file:{path}?mode=ro&uri=true', poolclass=NullPool)
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def age(self):
+        try:
+            return time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def engine_for_reads(self):
+        age = self.age()
+        if age is not None and age <= self.max_staleness / 2:
+            return self.engine
+        # Getting old: nothing written since means it is as good as new, otherwise refresh it
+        # while it can still be used
+        if age is not None and _data_version(self.engine) == _data_version(db.engine):
+            os.utime(self.path)
+            return self.engine
+        self.refresh_in_background()
+        return self.engine if age is not None and age <= self.max_staleness else None
+
+    def refresh(self):
+        started = time.time()
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        source = sqlite3.connect(self.primary_path, timeout=self.busy_timeout)
+        target = sqlite3.connect(tmp_path)
+        try:
+            # One step: a WAL reader never blocks writers, while a stepped copy restarts
+            # every time somebody records a payment
+            source.backup(target)
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+            source.close()
+        try:
+            os.utime(tmp_path, (started, started))
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except (OSError, sqlite3.Error):
+                self.app.logger.exception('Refreshing the reporting snapshot failed')
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='reporting-snapshot', daemon=True).start()
+
+
+class ReplicaSource:
+    """A database kept in sync elsewhere; trusted until it has been behind for too long."""
+
+    def __init__(self, url, max_staleness):
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.max_staleness = max_staleness
+        self._behind_since = None
+
+    def engine_for_reads(self):
+        if _data_version(self.engine) >= _data_version(db.engine):
+            self._behind_since = None
+            return self.engine
+        # Replication lag is only visible as a version gap, so time it from when it was seen
+        now = time.monotonic()
+        if self._behind_since is None:
+            self._behind_since = now
+        return self.engine if now - self._behind_since <= self.max_staleness else None
+
+
+@contextmanager
+def use_reporting():
+    """Send the SELECTs in this block to the reporting copy when it is fresh enough.
+
+    Yields the engine in use, or None when reads stay on the primary.
+    """
+    source = current_app.extensions.get('reporting')
+    engine = None
+    if source is not None:
+        try:
+            engine = source.engine_for_reads()
+        except (OSError, SQLAlchemyError):
+            current_app.logger.exception('Reporting database unavailable, reading from the primary')
+    token = reporting_engine.set(engine)
+    try:
+        yield engine
+    finally:
+        reporting_engine.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside a reporting block, for rows that must be current."""
+    token = reporting_engine.set(None)
+    try:
+        yield
+    finally:
+        reporting_engine.reset(token)
+
+
+def reporting_view(view):
+    """Mark a view whose reads, including a streamed response body, may use the reporting copy."""
+    view.reporting_reads = True
+    return view
+
+
+def init_reporting(app):
+    source = None
+    if app.config['REPORTING_DATABASE_URL']:
+        source = ReplicaSource(app.config['REPORTING_DATABASE_URL'], app.config['REPORTING_MAX_STALENESS'])
+    elif app.config['REPORTING_SNAPSHOT'] and database_profile(app.config) == 'sqlite':
+        with app.app_context():
+            primary_path = db.engine.url.database
+        if primary_path and primary_path != ':memory:':
+            path = app.config['REPORTING_SNAPSHOT_PATH'] or os.path.join(app.instance_path, 'reporting_snapshot.db')
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            source = SnapshotSource(app, primary_path, path, app.config['REPORTING_MAX_STALENESS'])
+    app.extensions['reporting'] = source
+    if source is None:
+        return
+    instrument_engine(app, source.engine)
+
+    # Entered before the view and left at teardown, which for a streamed export is only once
+    # the last row has been sent
+    @app.before_request
+    def enter_reporting_scope():
+        view = app.view_functions.get(request.endpoint)
+        if getattr(view, 'reporting_reads', False):
+            scope = use_reporting()
+            scope.__enter__()
+            g.reporting_scope = scope
+
+    @app.teardown_request
+    def leave_reporting_scope(error=None):
+        scope = g.pop('reporting_scope', None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
@@ -1,15 +1,15 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, make_response, send_file
+from flask import render_template, redirect, url_for, flash, request, jsonify, make_response
 from flask_login import login_user, logout_user, current_user, login_required
 from datetime import datetime, timedelta
-from models import db, User, Minister, Payment
-from forms import LoginForm, ChangePasswordForm, MinisterForm, PaymentForm, ReportForm
-import io
-import csv
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+from models import db, User, Minister, Payment, PaymentArchive, CarryForward, ArchivedYear, WeeklyRollup, DataVersion
+from forms import LoginForm, ChangePasswordForm, MinisterForm, PaymentForm, PaymentImportForm, BatchPaymentForm
+from pagination import keyset_paginate
+from stats_cache import cached
+from aggregates import all_time_savings, week_savings
+from search import search_ministers, autocomplete, minister_choices
+from payment_import import import_payments, record_payments, parse_amount
+from auth import HashingBusy, verify_password, change_password
+from reporting import reporting_view
 
 def init_routes(app):
     @app.route('/')
@@ -24,7 +24,12 @@ def init_routes(app):
         form = LoginForm()
         if form.validate_on_submit():
             user = User.query.filter_by(username=form.username.data).first()
-            if user is None or not user.check_password(form.password.data):
+            try:
+                valid = user is not None and verify_password(user, form.password.data)
+            except HashingBusy:
+                flash('The server is busy signing other people in, please try again in a moment.', 'warning')
+                return render_template('login.html', title='Sign In', form=form), 503
+            if not valid:
                 flash('Invalid username or password', 'danger')
                 return redirect(url_for('login'))
             login_user(user, remember=form.remember_me.data)
@@ -38,42 +43,99 @@ def init_routes(app):
     
     @app.route('/dashboard')
     @login_required
+    @reporting_view
     def dashboard():
-        # Get dashboard statistics
-        total_ministers = Minister.query.count()
-        total_savings = db.session.query(db.func.sum(Payment.amount)).scalar() or 0
-        
-        # Get top 3 savers
-        top_savers = Minister.query.order_by(Minister.total_savings.desc()).limit(3).all()
+        # This week's collections, Monday through Sunday
+        _, _, week_start = WeeklyRollup.week_of(datetime.now().date())
         
-        # Get recent payments
-        recent_payments = Payment.query.order_by(Payment.created_at.desc()).limit(5).all()
+        # Statistics only change on writes, so they are cached per data version
+        stats = cached(f'dashboard:{week_start.isoformat()}', lambda: compute_dashboard_stats(week_start))
         
         # Check if today is Sunday (weekday 6)
         today = datetime.now()
         is_sunday = today.weekday() == 6
         
         return render_template('dashboard.html', title='Dashboard', 
-                               total_ministers=total_ministers,
-                               total_savings=total_savings,
-                               top_savers=top_savers,
-                               recent_payments=recent_payments,
+                               total_ministers=stats['total_ministers'],
+                               total_savings=stats['total_savings'],
+                               week_total=stats['week_total'],
+                               top_savers=stats['top_savers'],
+                               recent_payments=stats['recent_payments'],
                                is_sunday=is_sunday)
     
+    def compute_dashboard_stats(week_start):
+        # Get dashboard statistics
+        total_ministers = Minister.query.count()
+        total_savings = all_time_savings(app.config['USE_WEEKLY_ROLLUPS'])
+        week_total = week_savings(week_start, app.config['USE_WEEKLY_ROLLUPS'])
+        
+        # Get top 3 savers
+        top_savers = db.session.execute(
+            db.select(Minister.full_name, Minister.total_savings)
+            .order_by(Minister.total_savings.desc()).limit(3)
+        ).all()
+        
+        # Get recent payments with the minister name joined in
+        recent_payments = db.session.execute(
+            db.select(Minister.full_name, Payment.amount, Payment.payment_date)
+            .join(Minister, Payment.minister_id == Minister.id)
+            .order_by(Payment.created_at.desc()).limit(5)
+        ).all()
+        
+        return {
+            'total_ministers': total_ministers,
+            'total_savings': total_savings,
+            'week_total': week_total,
+            'top_savers': [{'full_name': name, 'total_savings': total or 0} for name, total in top_savers],
+            'recent_payments': [
+                {'minister_name': name, 'amount': amount, 'payment_date': payment_date.strftime('%Y-%m-%d')}
+                for name, amount, payment_date in recent_payments
+            ]
+        }
+    
     @app.route('/ministers')
     @login_required
     def ministers():
         search = request.args.get('search', '')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = app.config['MINISTERS_PER_PAGE']
         if search:
-            ministers = Minister.query.filter(
-                db.or_(
-                    Minister.full_name.contains(search),
-                    Minister.department.contains(search)
-                )
-            ).all()
+            ministers, total = search_ministers(search, limit=per_page, offset=(page - 1) * per_page)
+        else:
+            total = Minister.query.count()
+            ministers = Minister.query.order_by(Minister.id).limit(per_page).offset((page - 1) * per_page).all()
+        pages = max((total + per_page - 1) // per_page, 1)
+        return render_template('ministers.html', title='Ministers', ministers=ministers, search=search,
+                               page=page, pages=pages, total=total)
+    
+    @app.route('/ministers/autocomplete')
+    @login_required
+    def ministers_autocomplete():
+        term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), app.config['AUTOCOMPLETE_MAX_RESULTS']))
+        results = autocomplete(term, limit) if term else []
+        return jsonify([
+            {'id': minister_id, 'full_name': full_name, 'department': department}
+            for minister_id, full_name, department in results
+        ])
+    
+    @app.route('/ministers/lookup')
+    @login_required
+    def ministers_lookup():
+        # Paginated picker data: ranked matches when searching, otherwise the cached A-Z list
+        term = request.args.get('q', '').strip()
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), app.config['AUTOCOMPLETE_MAX_RESULTS']))
+        offset = (page - 1) * per_page
+        if term:
+            rows = [(minister_id, full_name) for minister_id, full_name, _ in autocomplete(term, per_page + 1, offset)]
         else:
-            ministers = Minister.query.all()
-        return render_template('ministers.html', title='Ministers', ministers=ministers, search=search)
+            rows = minister_choices()[offset:offset + per_page + 1]
+        return jsonify({
+            'results': [{'id': minister_id, 'full_name': full_name} for minister_id, full_name in rows[:per_page]],
+            'page': page,
+            'has_more': len(rows) > per_page
+        })
     
     @app.route('/ministers/add', methods=['GET', 'POST'])
     @login_required
@@ -88,6 +150,7 @@ def init_routes(app):
                 date_joined=form.date_joined.data
             )
             db.session.add(minister)
+            DataVersion.bump()
             db.session.commit()
             flash(f'Minister {minister.full_name} has been added successfully!', 'success')
             return redirect(url_for('ministers'))
@@ -105,6 +168,7 @@ def init_routes(app):
             minister.email = form.email.data
             minister.date_joined = form.date_joined.data
             minister.updated_at = datetime.utcnow()
+            DataVersion.bump()
             db.session.commit()
             flash(f'Minister {minister.full_name} has been updated successfully!', 'success')
             return redirect(url_for('ministers'))
@@ -114,7 +178,11 @@ def init_routes(app):
     @login_required
     def delete_minister(id):
         minister = Minister.query.get_or_404(id)
+        WeeklyRollup.query.filter_by(minister_id=minister.id).delete()
+        PaymentArchive.query.filter_by(minister_id=minister.id).delete()
+        CarryForward.query.filter_by(minister_id=minister.id).delete()
         db.session.delete(minister)
+        DataVersion.bump()
         db.session.commit()
         flash(f'Minister {minister.full_name} has been deleted successfully!', 'success')
         return redirect(url_for('ministers'))
@@ -126,20 +194,38 @@ def init_routes(app):
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # Build query
-        query = Payment.query
+        # Page size and whether to pay for the COUNT(*)
+        per_page = request.args.get('per_page', app.config['PAYMENTS_PER_PAGE'], type=int)
+        per_page = max(1, min(per_page, app.config['PAYMENTS_MAX_PER_PAGE']))
+        with_total = request.args.get('total', '1' if app.config['PAYMENTS_SHOW_TOTAL'] else '0') != '0'
         
-        # Apply date filters if provided
+        # Build query, loading the minister in the same round trip
+        query = Payment.query.join(Minister).options(db.contains_eager(Payment.minister))
+        
+        # Apply date filters if provided; this page lists the hot table only, so a filter that
+        # reaches into archived years says where to find them instead
+        archived_before = None
         if start_date:
             query = query.filter(Payment.payment_date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+            boundary = ArchivedYear.boundary()
+            if boundary is not None and datetime.strptime(start_date, '%Y-%m-%d').date() < boundary:
+                archived_before = boundary
         if end_date:
             query = query.filter(Payment.payment_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
         
-        # Execute query
-        payments = query.order_by(Payment.payment_date.desc()).all()
-        
-        return render_template('payments.html', title='Payments', payments=payments, 
-                               start_date=start_date, end_date=end_date)
+        # Execute query one keyset page at a time
+        page = keyset_paginate(
+            query,
+            [Payment.payment_date, Payment.id],
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            per_page=per_page,
+            with_total=with_total
+        )
+        
+        return render_template('payments.html', title='Payments', payments=page.items, page=page,
+                               start_date=start_date, end_date=end_date, per_page=per_page,
+                               show_total=with_total, archived_before=archived_before)
     
     @app.route('/payments/add', methods=['GET', 'POST'])
     @login_required
@@ -160,24 +246,100 @@ def init_routes(app):
                 note=form.note.data
             )
             db.session.add(payment)
-            db.session.commit()
             
-            # Update minister's total savings
-            minister = Minister.query.get(form.minister_id.data)
-            minister.update_total_savings()
+            # Update minister's total savings in the same transaction
+            Minister.adjust_total_savings(payment.minister_id, payment.amount)
+            WeeklyRollup.apply(payment.minister_id, payment.payment_date, payment.amount)
+            DataVersion.bump()
+            db.session.commit()
             
+            minister = Minister.query.get(payment.minister_id)
             flash(f'Payment of UGX{payment.amount:.2f} for {minister.full_name} has been recorded successfully!', 'success')
             return redirect(url_for('payments'))
         return render_template('payment_form.html', title='Record Payment', form=form)
     
+    @app.route('/payments/import', methods=['GET', 'POST'])
+    @login_required
+    def import_payments_view():
+        form = PaymentImportForm()
+        result = None
+        if form.validate_on_submit():
+            result = import_payments(form.file.data.read(), dry_run=form.dry_run.data)
+            if result.inserted and not form.dry_run.data:
+                flash(f'Imported {result.inserted} payments totalling UGX{result.total_amount:.2f}.', 'success')
+            elif result.inserted:
+                flash(f'{result.inserted} payments are valid and ready to import.', 'info')
+            if result.errors:
+                flash(f'{len(result.errors)} rows could not be imported. See the list below.', 'warning')
+        return render_template('payment_import.html', title='Import Payments', form=form, result=result)
+    
+    @app.route('/payments/batch', methods=['GET', 'POST'])
+    @login_required
+    def batch_payments():
+        form = BatchPaymentForm()
+        ministers = db.session.execute(
+            db.select(Minister.id, Minister.full_name).order_by(Minister.full_name)
+        ).all()
+        
+        if request.method == 'GET':
+            # Default to the most recent Sunday
+            today = datetime.now().date()
+            form.payment_date.data = today - timedelta(days=(today.weekday() + 1) % 7)
+        
+        amounts = {}
+        errors = {}
+        if form.validate_on_submit():
+            payment_date = form.payment_date.data
+            week_number = form.week_number.data or payment_date.isocalendar()[1]
+            
+            # Collect every filled-in amount; one bad entry means nothing is saved
+            parsed = {}
+            for minister_id, full_name in ministers:
+                raw = request.form.get(f'amount-{minister_id}', '').strip()
+                amounts[minister_id] = raw
+                if not raw:
+                    continue
+                try:
+                    parsed[minister_id] = parse_amount(raw)
+                except ValueError:
+                    errors[minister_id] = 'Enter an amount of at least 0.01'
+            
+            entries = [
+                {
+                    'minister_id': minister_id,
+                    'amount': amount,
+                    'payment_date': payment_date,
+                    'week_number': week_number,
+                    'note': form.note.data or None,
+                    'created_at': datetime.utcnow()
+                }
+                for minister_id, amount in parsed.items()
+            ]
+            
+            if errors:
+                flash('Some amounts are invalid. Nothing has been saved yet.', 'danger')
+            elif not entries:
+                flash('Enter at least one amount to record.', 'warning')
+            else:
+                record_payments(entries)
+                db.session.commit()
+                total = sum(entry['amount'] for entry in entries)
+                flash(f'Recorded {len(entries)} payments totalling UGX{total:.2f} for {payment_date}.', 'success')
+                return redirect(url_for('payments'))
+        
+        return render_template('batch_payments.html', title='Sunday Batch Entry', form=form,
+                               ministers=ministers, amounts=amounts, errors=errors)
+    
     @app.route('/payments/edit/<int:id>', methods=['GET', 'POST'])
     @login_required
     def edit_payment(id):
         payment = Payment.query.get_or_404(id)
         form = PaymentForm(obj=payment)
         if form.validate_on_submit():
-            # Store old minister ID for updating totals
+            # Store old minister ID, amount and date for updating totals
             old_minister_id = payment.minister_id
+            old_amount = payment.amount
+            old_payment_date = payment.payment_date
             
             # Update payment details
             payment.minister_id = form.minister_id.data
@@ -186,15 +348,19 @@ def init_routes(app):
             payment.week_number = form.week_number.data if form.week_number.data else form.payment_date.data.isocalendar()[1]
             payment.note = form.note.data
             
-            db.session.commit()
-            
-            # Update totals for both old and new ministers if changed
+            # Move the amount between ministers if changed, otherwise apply the difference
             if old_minister_id != payment.minister_id:
-                old_minister = Minister.query.get(old_minister_id)
-                old_minister.update_total_savings()
+                Minister.adjust_total_savings(old_minister_id, -old_amount)
+                Minister.adjust_total_savings(payment.minister_id, payment.amount)
+            else:
+                Minister.adjust_total_savings(payment.minister_id, payment.amount - old_amount)
             
-            minister = Minister.query.get(payment.minister_id)
-            minister.update_total_savings()
+            # Move the payment out of its old week and into the new one
+            WeeklyRollup.apply(old_minister_id, old_payment_date, -old_amount, -1)
+            WeeklyRollup.apply(payment.minister_id, payment.payment_date, payment.amount)
+            
+            DataVersion.bump()
+            db.session.commit()
             
             flash(f'Payment has been updated successfully!', 'success')
             return redirect(url_for('payments'))
@@ -204,338 +370,34 @@ def init_routes(app):
     @login_required
     def delete_payment(id):
         payment = Payment.query.get_or_404(id)
-        minister_id = payment.minister_id
         db.session.delete(payment)
-        db.session.commit()
         
-        # Update minister's total savings
-        minister = Minister.query.get(minister_id)
-        minister.update_total_savings()
+        # Update minister's total savings in the same transaction
+        Minister.adjust_total_savings(payment.minister_id, -payment.amount)
+        WeeklyRollup.apply(payment.minister_id, payment.payment_date, -payment.amount, -1)
+        DataVersion.bump()
+        db.session.commit()
         
         flash(f'Payment has been deleted successfully!', 'success')
         return redirect(url_for('payments'))
     
-    @app.route('/reports')
-    @login_required
-    def reports():
-        form = ReportForm()
-        return render_template('reports.html', title='Reports', form=form)
-    
-    @app.route('/reports/generate/<report_type>', methods=['POST'])
-    @login_required
-    def generate_report(report_type):
-        form = ReportForm()
-        if not form.validate_on_submit():
-            flash('Invalid date range provided', 'danger')
-            return redirect(url_for('reports'))
-        
-        start_date = form.start_date.data
-        end_date = form.end_date.data
-        
-        # Format dates for filename
-        start_str = start_date.strftime('%Y%m%d')
-        end_str = end_date.strftime('%Y%m%d')
-        
-        if report_type == 'summary':
-            return generate_summary_report(start_date, end_date, start_str, end_str)
-        elif report_type == 'detailed':
-            return generate_detailed_report(start_date, end_date, start_str, end_str)
-        else:
-            flash('Invalid report type', 'danger')
-            return redirect(url_for('reports'))
-    
-    def generate_summary_report(start_date, end_date, start_str, end_str):
-        # Get payments in date range
-        payments = Payment.query.filter(
-            Payment.payment_date >= start_date,
-            Payment.payment_date <= end_date
-        ).all()
-        
-        # Calculate summary statistics
-        total_amount = sum(p.amount for p in payments)
-        total_payments = len(payments)
-        
-        # Group by minister
-        minister_totals = {}
-        for payment in payments:
-            minister_id = payment.minister_id
-            if minister_id not in minister_totals:
-                minister_totals[minister_id] = {
-                    'name': payment.minister.full_name,
-                    'amount': 0,
-                    'count': 0
-                }
-            minister_totals[minister_id]['amount'] += payment.amount
-            minister_totals[minister_id]['count'] += 1
-        
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['Lavisco Ministers Saving Scheme - Summary Report'])
-        writer.writerow([f'Period: {start_date} to {end_date}'])
-        writer.writerow([''])
-        
-        # Write summary statistics
-        writer.writerow(['Summary Statistics'])
-        writer.writerow(['Total Amount', f'UGX{total_amount:.2f}'])
-        writer.writerow(['Total Payments', total_payments])
-        writer.writerow([''])
-        
-        # Write minister totals
-        writer.writerow(['Minister Contributions'])
-        writer.writerow(['Minister Name', 'Total Amount', 'Number of Payments'])
-        
-        for minister_id, data in sorted(minister_totals.items(), key=lambda x: x[1]['amount'], reverse=True):
-            writer.writerow([data['name'], f'${data["amount"]:.2f}', data['count']])
-        
-        # Prepare response
-        output.seek(0)
-        response = make_response(output.getvalue())
-        response.headers['Content-Disposition'] = f'attachment; filename=summary_report_{start_str}_to_{end_str}.csv'
-        response.headers['Content-type'] = 'text/csv'
-        return response
-    
-    def generate_detailed_report(start_date, end_date, start_str, end_str):
-        # Get payments in date range
-        payments = Payment.query.filter(
-            Payment.payment_date >= start_date,
-            Payment.payment_date <= end_date
-        ).order_by(Payment.payment_date).all()
-        
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['Lavisco Ministers Saving Scheme - Detailed Report'])
-        writer.writerow([f'Period: {start_date} to {end_date}'])
-        writer.writerow([''])
-        
-        # Write payment details
-        writer.writerow(['Payment Details'])
-        writer.writerow(['Date', 'Minister Name', 'Amount', 'Week Number', 'Note'])
-        
-        for payment in payments:
-            writer.writerow([
-                payment.payment_date.strftime('%Y-%m-%d'),
-                payment.minister.full_name,
-                f'${payment.amount:.2f}',
-                payment.week_number or '',
-                payment.note or ''
-            ])
-        
-        # Prepare response
-        output.seek(0)
-        response = make_response(output.getvalue())
-        response.headers['Content-Disposition'] = f'attachment; filename=detailed_report_{start_str}_to_{end_str}.csv'
-        response.headers['Content-type'] = 'text/csv'
-        return response
-    
-    @app.route('/reports/pdf/<report_type>', methods=['POST'])
-    @login_required
-    def generate_pdf_report(report_type):
-        form = ReportForm()
-        if not form.validate_on_submit():
-            flash('Invalid date range provided', 'danger')
-            return redirect(url_for('reports'))
-        
-        start_date = form.start_date.data
-        end_date = form.end_date.data
-        
-        # Format dates for filename
-        start_str = start_date.strftime('%Y%m%d')
-        end_str = end_date.strftime('%Y%m%d')
-        
-        if report_type == 'summary':
-            return generate_summary_pdf(start_date, end_date, start_str, end_str)
-        elif report_type == 'detailed':
-            return generate_detailed_pdf(start_date, end_date, start_str, end_str)
-        else:
-            flash('Invalid report type', 'danger')
-            return redirect(url_for('reports'))
-    
-    def generate_summary_pdf(start_date, end_date, start_str, end_str):
-        # Get payments in date range
-        payments = Payment.query.filter(
-            Payment.payment_date >= start_date,
-            Payment.payment_date <= end_date
-        ).all()
-        
-        # Calculate summary statistics
-        total_amount = sum(p.amount for p in payments)
-        total_payments = len(payments)
-        
-        # Group by minister
-        minister_totals = {}
-        for payment in payments:
-            minister_id = payment.minister_id
-            if minister_id not in minister_totals:
-                minister_totals[minister_id] = {
-                    'name': payment.minister.full_name,
-                    'amount': 0,
-                    'count': 0
-                }
-            minister_totals[minister_id]['amount'] += payment.amount
-            minister_totals[minister_id]['count'] += 1
-        
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = styles['h1']
-        heading_style = styles['h2']
-        normal_style = styles['Normal']
-        
-        # Add title
-        elements.append(Paragraph("Lavisco Ministers Saving Scheme - Summary Report", title_style))
-        elements.append(Spacer(1, 12))
-        
-        # Add date range
-        elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
-        elements.append(Spacer(1, 12))
-        
-        # Add summary statistics
-        elements.append(Paragraph("Summary Statistics", heading_style))
-        elements.append(Spacer(1, 6))
-        
-        summary_data = [
-            ['Total Amount', f'${total_amount:.2f}'],
-            ['Total Payments', str(total_payments)]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(summary_table)
-        elements.append(Spacer(1, 12))
-        
-        # Add minister totals
-        elements.append(Paragraph("Minister Contributions", heading_style))
-        elements.append(Spacer(1, 6))
-        
-        minister_data = [['Minister Name', 'Total Amount', 'Number of Payments']]
-        
-        for minister_id, data in sorted(minister_totals.items(), key=lambda x: x[1]['amount'], reverse=True):
-            minister_data.append([
-                data['name'],
-                f'${data["amount"]:.2f}',
-                str(data['count'])
-            ])
-        
-        minister_table = Table(minister_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-        minister_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(minister_table)
-        
-        # Build PDF
-        doc.build(elements)
-        
-        buffer.seek(0)
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Disposition'] = f'attachment; filename=summary_report_{start_str}_to_{end_str}.pdf'
-        response.headers['Content-type'] = 'application/pdf'
-        return response
-    
-    def generate_detailed_pdf(start_date, end_date, start_str, end_str):
-        # Get payments in date range
-        payments = Payment.query.filter(
-            Payment.payment_date >= start_date,
-            Payment.payment_date <= end_date
-        ).order_by(Payment.payment_date).all()
-        
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = styles['h1']
-        heading_style = styles['h2']
-        normal_style = styles['Normal']
-        
-        # Add title
-        elements.append(Paragraph("Lavisco Ministers Saving Scheme - Detailed Report", title_style))
-        elements.append(Spacer(1, 12))
-        
-        # Add date range
-        elements.append(Paragraph(f"Period: {start_date} to {end_date}", normal_style))
-        elements.append(Spacer(1, 12))
-        
-        # Add payment details
-        elements.append(Paragraph("Payment Details", heading_style))
-        elements.append(Spacer(1, 6))
-        
-        payment_data = [['Date', 'Minister Name', 'Amount', 'Week Number', 'Note']]
-        
-        for payment in payments:
-            payment_data.append([
-                payment.payment_date.strftime('%Y-%m-%d'),
-                payment.minister.full_name,
-                f'${payment.amount:.2f}',
-                str(payment.week_number) if payment.week_number else '',
-                payment.note or ''
-            ])
-        
-        payment_table = Table(payment_data, colWidths=[1*inch, 2*inch, 1*inch, 1*inch, 2*inch])
-        payment_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8)
-        ]))
-        
-        elements.append(payment_table)
-        
-        # Build PDF
-        doc.build(elements)
-        
-        buffer.seek(0)
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Disposition'] = f'attachment; filename=detailed_report_{start_str}_to_{end_str}.pdf'
-        response.headers['Content-type'] = 'application/pdf'
-        return response
-    
     @app.route('/profile', methods=['GET', 'POST'])
     @login_required
     def profile():
         form = ChangePasswordForm()
         if form.validate_on_submit():
-            if current_user.check_password(form.current_password.data):
-                current_user.set_password(form.new_password.data)
-                db.session.commit()
-                flash('Your password has been changed successfully!', 'success')
-                return redirect(url_for('dashboard'))
-            else:
-                flash('Current password is incorrect', 'danger')
+            # current_user may be a cached copy; change the real row
+            user = db.session.get(User, current_user.id)
+            try:
+                if verify_password(user, form.current_password.data):
+                    change_password(user, form.new_password.data)
+                    db.session.commit()
+                    flash('Your password has been changed successfully!', 'success')
+                    return redirect(url_for('dashboard'))
+                else:
+                    flash('Current password is incorrect', 'danger')
+            except HashingBusy:
+                flash('The server is busy, please try again in a moment.', 'warning')
         
         return render_template('profile.html', title='Profile', form=form)
     
@@ -0,0 +1,152 @@
+import re
+from flask import current_app
+from models import db, Minister
+from stats_cache import cached
+
+# SQLite keeps an FTS5 index of minister names and departments in step through triggers;
+# other databases (or SQLite builds without FTS5) fall back to LIKE queries.
+
+FTS_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS minister_fts USING fts5(
+        full_name, department,
+        content='minister', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS minister_fts_ai AFTER INSERT ON minister BEGIN
+        INSERT INTO minister_fts(rowid, full_name, department) VALUES (new.id, new.full_name, new.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS minister_fts_ad AFTER DELETE ON minister BEGIN
+        INSERT INTO minister_fts(minister_fts, rowid, full_name, department)
+        VALUES ('delete', old.id, old.full_name, old.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS minister_fts_au AFTER UPDATE OF full_name, department ON minister BEGIN
+        INSERT INTO minister_fts(minister_fts, rowid, full_name, department)
+        VALUES ('delete', old.id, old.full_name, old.department);
+        INSERT INTO minister_fts(rowid, full_name, department) VALUES (new.id, new.full_name, new.department);
+    END""",
+]
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def setup_search(app):
+    """Create the FTS5 index and its triggers if missing; returns True when it is in use."""
+    with app.app_context():
+        available = False
+        if db.engine.dialect.name == 'sqlite':
+            try:
+                with db.engine.begin() as conn:
+                    exists = conn.execute(db.text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'minister_fts'"
+                    )).first()
+                    for statement in FTS_SETUP:
+                        conn.execute(db.text(statement))
+                    if not exists:
+                        conn.execute(db.text("INSERT INTO minister_fts(minister_fts) VALUES ('rebuild')"))
+                available = True
+            except db.exc.OperationalError:
+                app.logger.warning('SQLite FTS5 is not available; minister search falls back to LIKE')
+        app.extensions['minister_fts'] = available
+        return available
+
+
+def exclude_search_tables(object, name, type_, reflected, compare_to):
+    # Keeps the FTS5 table and its shadow tables out of migration autogenerate
+    return not (type_ == 'table' and name.startswith('minister_fts'))
+
+
+def fts_enabled():
+    # Looked up on first use rather than at startup. The index itself is made by flask init-db,
+    # possibly after this process started, so only finding it is remembered
+    available = current_app.extensions.get('minister_fts')
+    if available is None:
+        available = db.engine.dialect.name == 'sqlite' and db.session.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'minister_fts'"
+        )).first() is not None
+        if available:
+            current_app.extensions['minister_fts'] = True
+    return available
+
+
+def rebuild_index():
+    if fts_enabled():
+        db.session.execute(db.text("INSERT INTO minister_fts(minister_fts) VALUES ('rebuild')"))
+        db.session.commit()
+
+
+def _match_expression(term):
+    # Every word must match as a prefix: "jo ki" -> "jo"* AND "ki"*
+    tokens = TOKEN_PATTERN.findall(term)
+    return ' '.join(f'"{token}"*' for token in tokens) if tokens else None
+
+
+def _like_filter(term, prefix_only=False):
+    conditions = []
+    for token in TOKEN_PATTERN.findall(term) or [term]:
+        if prefix_only:
+            # Start of the name, or the start of any later word in it
+            conditions.append(db.or_(
+                Minister.full_name.ilike(f'{token}%'),
+                Minister.full_name.ilike(f'% {token}%'),
+                Minister.department.ilike(f'{token}%')
+            ))
+        else:
+            conditions.append(db.or_(
+                Minister.full_name.contains(token),
+                Minister.department.contains(token)
+            ))
+    return db.and_(*conditions)
+
+
+def search_ministers(term, limit=50, offset=0):
+    """Return (ministers, total) for the page search, best matches first."""
+    if fts_enabled():
+        expression = _match_expression(term)
+        if expression is None:
+            return [], 0
+        total = db.session.execute(
+            db.text('SELECT count(*) FROM minister_fts WHERE minister_fts MATCH :q'), {'q': expression}
+        ).scalar()
+        ids = db.session.execute(
+            db.text('SELECT rowid FROM minister_fts WHERE minister_fts MATCH :q ORDER BY rank LIMIT :limit OFFSET :offset'),
+            {'q': expression, 'limit': limit, 'offset': offset}
+        ).scalars().all()
+        by_id = {m.id: m for m in Minister.query.filter(Minister.id.in_(ids))} if ids else {}
+        return [by_id[i] for i in ids if i in by_id], total
+
+    query = Minister.query.filter(_like_filter(term))
+    total = query.count()
+    return query.order_by(Minister.full_name, Minister.id).limit(limit).offset(offset).all(), total
+
+
+def minister_choices():
+    # (id, full_name) pairs for every minister, cached until the next write
+    return cached('minister_choices', lambda: [
+        [minister_id, full_name] for minister_id, full_name in db.session.execute(
+            db.select(Minister.id, Minister.full_name).order_by(Minister.full_name, Minister.id)
+        )
+    ])
+
+
+def autocomplete(term, limit=10, offset=0):
+    """Prefix matches as (id, full_name, department) rows for typeahead lookups."""
+    if fts_enabled():
+        expression = _match_expression(term)
+        if expression is None:
+            return []
+        return db.session.execute(
+            db.text(
+                'SELECT m.id, m.full_name, m.department FROM minister_fts '
+                'JOIN minister AS m ON m.id = minister_fts.rowid '
+                'WHERE minister_fts MATCH :q ORDER BY rank LIMIT :limit OFFSET :offset'
+            ),
+            {'q': expression, 'limit': limit, 'offset': offset}
+        ).all()
+
+    return db.session.execute(
+        db.select(Minister.id, Minister.full_name, Minister.department)
+        .where(_like_filter(term, prefix_only=True))
+        .order_by(Minister.full_name, Minister.id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
@@ -0,0 +1,124 @@
+import os
+import random
+from datetime import date, datetime, timedelta
+from models import db, User, Minister, Payment, WeeklyRollup, DataVersion
+
+FIRST_NAMES = ['John', 'Mary', 'Peter', 'Grace', 'Joseph', 'Sarah', 'David', 'Ruth', 'Moses', 'Esther',
+               'Samuel', 'Florence', 'Daniel', 'Agnes', 'Paul', 'Rebecca', 'Isaac', 'Harriet', 'Simon', 'Juliet']
+LAST_NAMES = ['Okello', 'Nakato', 'Mugisha', 'Namubiru', 'Ssempala', 'Achieng', 'Kato', 'Nalwoga', 'Tumusiime',
+              'Atim', 'Byaruhanga', 'Nabirye', 'Ochieng', 'Kyomuhendo', 'Lubega', 'Akello', 'Waiswa', 'Nansubuga']
+DEPARTMENTS = ['Choir', 'Ushers', 'Youth', 'Media', 'Prayer', 'Children', 'Protocol', 'Evangelism', None]
+
+
+def generate(ministers=100, payments=10000, seed=1, batch_size=10000, end_date=None):
+    """Bulk-insert synthetic ministers and weekly Sunday payments, then fix up totals and rollups.
+
+    Each minister has a usual contribution and attendance rate, so the history has the gaps and
+    spread of real collections. Payments run backwards from the most recent Sunday to each
+    minister's join date, so fewer are made when every history runs out first.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    last_sunday = end_date - timedelta(days=(end_date.weekday() + 1) % 7)
+
+    db.session.execute(db.insert(Minister), [
+        {
+            'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i + 1}',
+            'department': rng.choice(DEPARTMENTS),
+            'phone': f'07{rng.randint(10000000, 99999999)}',
+            'date_joined': last_sunday - timedelta(days=rng.randint(0, 3650)),
+            'total_savings': 0.0,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        }
+        for i in range(ministers)
+    ])
+    joined = db.session.execute(
+        db.select(Minister.id, Minister.date_joined).order_by(Minister.id.desc()).limit(ministers)
+    ).all()
+    minister_ids = [minister_id for minister_id, _ in joined]
+    profiles = [(minister_id, date_joined, rng.choice([5000, 10000, 20000, 50000]), rng.uniform(0.6, 0.98))
+                for minister_id, date_joined in joined]
+
+    inserted = 0
+    week = 0
+    batch = []
+    while inserted < payments and profiles:
+        sunday = last_sunday - timedelta(weeks=week)
+        iso_week = sunday.isocalendar()[1]
+        # Walking backwards, a minister drops out for good at the Sunday before they joined
+        profiles = [profile for profile in profiles if profile[1] <= sunday]
+        for minister_id, _, usual, attendance in profiles:
+            if inserted >= payments:
+                break
+            if rng.random() > attendance:
+                continue
+            amount = max(1000, round(usual * rng.uniform(0.5, 1.5), -2))
+            batch.append({
+                'minister_id': minister_id,
+                'amount': float(amount),
+                'payment_date': sunday,
+                'week_number': iso_week,
+                'note': 'Sunday collection' if rng.random() < 0.1 else None,
+                'created_at': datetime.combine(sunday, datetime.min.time()) + timedelta(hours=11)
+            })
+            inserted += 1
+            if len(batch) >= batch_size:
+                db.session.execute(db.insert(Payment), batch)
+                batch = []
+        week += 1
+    if batch:
+        db.session.execute(db.insert(Payment), batch)
+
+    # Totals and rollups from the inserted history in set-based statements
+    totals = (
+        db.select(db.func.coalesce(db.func.sum(Payment.amount), 0))
+        .where(Payment.minister_id == Minister.id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(Minister).where(Minister.id.in_(minister_ids)).values(total_savings=totals)
+        .execution_options(synchronize_session=False)
+    )
+    WeeklyRollup.rebuild()
+    DataVersion.bump()
+    db.session.commit()
+    return len(minister_ids), inserted
+
+
+def scratch_app(config_class, workdir, **overrides):
+    """A throwaway app on its own SQLite file under workdir, with local caches."""
+    from app import create_app
+    from search import setup_search
+
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, "scratch.db")}',
+        'WTF_CSRF_ENABLED': False,
+        'TESTING': True,
+        'STATS_CACHE_BACKEND': 'memory',
+        'REPORT_CACHE_DIR': os.path.join(workdir, 'reports'),
+        # Measured and explained against the primary, where the statements are recorded
+        'REPORTING_SNAPSHOT': False,
+    }
+    settings.update(overrides)
+    app = create_app(type('ScratchConfig', (config_class,), settings))
+    with app.app_context():
+        db.create_all()
+    setup_search(app)
+    return app
+
+
+def login_client(app):
+    # Signs a test client in as the first user without going through password hashing
+    with app.app_context():
+        user = User.query.first()
+        if user is None:
+            user = User(username='scratch', email='scratch@example.com', full_name='Scratch User')
+            db.session.add(user)
+            db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
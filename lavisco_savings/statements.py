@@ -0,0 +1,182 @@
+from datetime import date, timedelta
+from itertools import groupby
+from models import db, Minister, ArchivedYear, CarryForward
+from archive import source_for, frozen_year
+
+# Minister statements. Running balance, change on the previous payment and monthly subtotals
+# all come out of one ordered query with SUM() OVER / LAG() OVER windows, so a statement is a
+# single pass over the minister's payments and the batch is a single pass over all of them.
+
+# Position of each column in a statement row; rows are shipped to the PDF workers as tuples
+STATEMENT_COLUMNS = ('minister_id', 'payment_date', 'amount', 'week_number', 'note',
+                     'balance', 'change', 'period_total', 'period_year', 'period_month')
+
+
+def statement_query(start_date, end_date, minister_id=None):
+    """Statement rows for payments in the range, ordered by minister then date."""
+    boundary = ArchivedYear.boundary()
+    frozen = frozen_year(start_date, boundary)
+    # With an archive the windows start after the frozen year, and its carry-forward seeds the
+    # running balance and the first change
+    since = None if frozen is None else date(frozen + 1, 1, 1)
+    payments = source_for(boundary, since, end_date, None if minister_id is None else [minister_id])
+
+    order = (payments.c.payment_date, payments.c.id)
+    year = db.extract('year', payments.c.payment_date)
+    month = db.extract('month', payments.c.payment_date)
+    # Months cut by start_date are split in two so the subtotal only covers the statement range
+    period = (payments.c.minister_id, year, month, payments.c.payment_date >= start_date)
+
+    balance = db.func.sum(payments.c.amount).over(
+        partition_by=payments.c.minister_id, order_by=order, rows=(None, 0)
+    )
+    previous = db.func.lag(payments.c.amount)
+    if since is not None:
+        balance = db.func.coalesce(CarryForward.total_amount, 0) + balance
+        previous = db.func.lag(payments.c.amount, 1, CarryForward.last_amount)
+
+    # The windows see everything up to end_date, so the balance includes earlier savings and
+    # the first change is measured against the payment before the range
+    windowed = db.select(
+        payments.c.minister_id,
+        payments.c.id,
+        payments.c.payment_date,
+        payments.c.amount,
+        payments.c.week_number,
+        payments.c.note,
+        balance.label('balance'),
+        (payments.c.amount - previous.over(
+            partition_by=payments.c.minister_id, order_by=order
+        )).label('change'),
+        db.func.sum(payments.c.amount).over(partition_by=period).label('period_total'),
+        year.label('period_year'),
+        month.label('period_month')
+    ).where(payments.c.payment_date <= end_date)
+    if since is not None:
+        windowed = windowed.outerjoin(CarryForward, db.and_(
+            CarryForward.minister_id == payments.c.minister_id, CarryForward.year == frozen
+        )).where(payments.c.payment_date >= since)
+    if minister_id is not None:
+        windowed = windowed.where(payments.c.minister_id == minister_id)
+    windowed = windowed.subquery()
+
+    return db.select(*(windowed.c[name] for name in STATEMENT_COLUMNS)).where(
+        windowed.c.payment_date >= start_date
+    ).order_by(windowed.c.minister_id, windowed.c.payment_date, windowed.c.id)
+
+
+def opening_balances(start_date, minister_id=None):
+    """{minister_id: savings before start_date}."""
+    boundary = ArchivedYear.boundary()
+    frozen = frozen_year(start_date, boundary)
+    balances = {}
+    since = None
+    if frozen is not None:
+        # Frozen savings up to the end of that year, plus what was paid since
+        carried = db.select(CarryForward.minister_id, CarryForward.total_amount).where(CarryForward.year == frozen)
+        if minister_id is not None:
+            carried = carried.where(CarryForward.minister_id == minister_id)
+        balances = dict(db.session.execute(carried).all())
+        since = date(frozen + 1, 1, 1)
+
+    payments = source_for(boundary, since, start_date - timedelta(days=1),
+                          None if minister_id is None else [minister_id])
+    stmt = db.select(payments.c.minister_id, db.func.sum(payments.c.amount)).where(
+        payments.c.payment_date < start_date
+    ).group_by(payments.c.minister_id)
+    if since is not None:
+        stmt = stmt.where(payments.c.payment_date >= since)
+    if minister_id is not None:
+        stmt = stmt.where(payments.c.minister_id == minister_id)
+    for paid_minister_id, amount in db.session.execute(stmt):
+        balances[paid_minister_id] = balances.get(paid_minister_id, 0.0) + amount
+    return balances
+
+
+def with_subtotals(rows):
+    """Yield ('payment', row) for each row and ('subtotal', (year, month, total)) after each month."""
+    previous = None
+    for row in rows:
+        if previous is not None and previous[8:10] != row[8:10]:
+            yield 'subtotal', (previous[8], previous[9], previous[7])
+        yield 'payment', row
+        previous = row
+    if previous is not None:
+        yield 'subtotal', (previous[8], previous[9], previous[7])
+
+
+class Statement:
+    def __init__(self, minister_id, full_name, start_date, end_date, opening_balance, rows):
+        self.minister_id = minister_id
+        self.full_name = full_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.opening_balance = opening_balance
+        self.rows = rows
+        self.closing_balance = rows[-1][5] if rows else opening_balance
+        self.total_amount = self.closing_balance - opening_balance
+
+    def lines(self):
+        return with_subtotals(self.rows)
+
+
+def minister_statement(minister, start_date, end_date):
+    rows = [tuple(row) for row in db.session.execute(statement_query(start_date, end_date, minister.id))]
+    opening = opening_balances(start_date, minister.id).get(minister.id, 0.0)
+    return Statement(minister.id, minister.full_name, start_date, end_date, opening, rows)
+
+
+def all_statements(start_date, end_date, batch_size):
+    """Yield a Statement for every minister who had joined by end_date, in id order.
+
+    Rows are streamed from one query over all ministers; only one minister's rows are held
+    at a time.
+    """
+    roster = db.session.execute(
+        db.select(Minister.id, Minister.full_name)
+        .where(db.or_(Minister.date_joined.is_(None), Minister.date_joined <= end_date))
+        .order_by(Minister.id)
+    ).all()
+    openings = opening_balances(start_date)
+
+    result = db.session.execute(statement_query(start_date, end_date).execution_options(yield_per=batch_size))
+    try:
+        grouped = groupby((tuple(row) for row in result), key=lambda row: row[0])
+        current_id, current_rows = next(grouped, (None, None))
+        for minister_id, full_name in roster:
+            # Payments of ministers not on the roster are skipped over
+            while current_id is not None and current_id < minister_id:
+                current_id, current_rows = next(grouped, (None, None))
+            rows = list(current_rows) if current_id == minister_id else []
+            yield Statement(minister_id, full_name, start_date, end_date, openings.get(minister_id, 0.0), rows)
+    finally:
+        result.close()
+
+
+def statement_csv_rows(statement):
+    # Write header
+    yield ['Lavisco Ministers Saving Scheme - Minister Statement']
+    yield [f'Minister: {statement.full_name}']
+    yield [f'Period: {statement.start_date} to {statement.end_date}']
+    yield ['']
+
+    yield ['Opening Balance', f'UGX{statement.opening_balance:.2f}']
+    yield ['Saved in Period', f'UGX{statement.total_amount:.2f}']
+    yield ['Closing Balance', f'UGX{statement.closing_balance:.2f}']
+    yield ['']
+
+    # Write payment lines with monthly subtotals
+    yield ['Date', 'Week Number', 'Amount', 'Change', 'Balance', 'Note']
+    for kind, row in statement.lines():
+        if kind == 'subtotal':
+            year, month, total = row
+            yield [f'Subtotal {year}-{month:02d}', '', f'UGX{total:.2f}', '', '', '']
+            continue
+        yield [
+            row[1].strftime('%Y-%m-%d'),
+            row[3] or '',
+            f'UGX{row[2]:.2f}',
+            '' if row[6] is None else f'{row[6]:+.2f}',
+            f'UGX{row[5]:.2f}',
+            row[4] or ''
+        ]
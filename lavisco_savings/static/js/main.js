@@ -69,4 +69,147 @@ window.addEventListener('load', function() {
             }, 500);
         }
     }, 5000); // Maximum 5 seconds loading time
-});
\ No newline at end of file
+});
+// Render PDF reports as background jobs and download them when ready
+document.addEventListener('DOMContentLoaded', function() {
+    const pdfForms = document.querySelectorAll('form.pdf-export-form');
+    pdfForms.forEach(function(form) {
+        form.addEventListener('submit', function(e) {
+            e.preventDefault();
+            const pane = form.closest('.tab-pane') || document;
+            const status = form.querySelector('.pdf-export-status');
+            
+            // Carry the date range over from the report form in the same tab
+            ['start_date', 'end_date'].forEach(function(name) {
+                const source = pane.querySelector('input[name="' + name + '"]:not([type="hidden"])');
+                let target = form.querySelector('input[type="hidden"][name="' + name + '"]');
+                if (!target) {
+                    target = document.createElement('input');
+                    target.type = 'hidden';
+                    target.name = name;
+                    form.appendChild(target);
+                }
+                target.value = source ? source.value : '';
+            });
+            
+            const fallback = function() { form.submit(); };
+            status.textContent = 'Preparing report...';
+            
+            fetch(form.dataset.jobUrl, {method: 'POST', body: new FormData(form), credentials: 'same-origin'})
+                .then(function(response) { return response.ok ? response.json() : Promise.reject(response); })
+                .then(function poll(job) {
+                    if (job.status === 'done') {
+                        status.textContent = '';
+                        window.location = job.download_url;
+                    } else if (job.status === 'failed') {
+                        status.textContent = 'Report failed: ' + (job.error || 'unknown error');
+                    } else {
+                        setTimeout(function() {
+                            fetch(job.status_url || window.location.pathname, {credentials: 'same-origin'})
+                                .then(function(response) { return response.ok ? response.json() : Promise.reject(response); })
+                                .then(function(next) {
+                                    next.status_url = job.status_url;
+                                    poll(next);
+                                })
+                                .catch(fallback);
+                        }, 1000);
+                    }
+                })
+                .catch(fallback);
+        });
+    });
+});
+
+// Minister picker: fetch matching ministers page by page instead of shipping one huge <select>
+document.addEventListener('DOMContentLoaded', function() {
+    const pickers = document.querySelectorAll('.minister-typeahead');
+    pickers.forEach(function(picker) {
+        const nameInput = picker.querySelector('input[type="text"]');
+        // The hidden id field is rendered by form.hidden_tag()
+        const idInput = picker.closest('form').querySelector('input[name="' + picker.dataset.idField + '"]');
+        const menu = picker.querySelector('.minister-typeahead-results');
+        let timer = null;
+        let page = 1;
+        
+        function render(data, append) {
+            if (!append) {
+                menu.innerHTML = '';
+            }
+            const more = menu.querySelector('.typeahead-more');
+            if (more) {
+                more.remove();
+            }
+            data.results.forEach(function(minister) {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'dropdown-item';
+                item.textContent = minister.full_name;
+                item.addEventListener('click', function() {
+                    nameInput.value = minister.full_name;
+                    idInput.value = minister.id;
+                    menu.classList.remove('show');
+                });
+                menu.appendChild(item);
+            });
+            if (data.has_more) {
+                const loadMore = document.createElement('button');
+                loadMore.type = 'button';
+                loadMore.className = 'dropdown-item text-primary typeahead-more';
+                loadMore.textContent = 'Show more...';
+                loadMore.addEventListener('click', function(e) {
+                    e.stopPropagation();
+                    lookup(page + 1, true);
+                });
+                menu.appendChild(loadMore);
+            }
+            if (!menu.children.length) {
+                menu.innerHTML = '<span class="dropdown-item-text text-muted">No matching ministers</span>';
+            }
+            menu.classList.add('show');
+        }
+        
+        function lookup(nextPage, append) {
+            const url = picker.dataset.lookupUrl + '?q=' + encodeURIComponent(nameInput.value.trim()) + '&page=' + nextPage;
+            fetch(url, {credentials: 'same-origin'})
+                .then(function(response) { return response.json(); })
+                .then(function(data) {
+                    page = data.page;
+                    render(data, append);
+                });
+        }
+        
+        nameInput.addEventListener('input', function() {
+            // Typing invalidates the previous choice until a new one is picked
+            idInput.value = '';
+            clearTimeout(timer);
+            timer = setTimeout(function() { lookup(1, false); }, 200);
+        });
+        nameInput.addEventListener('focus', function() {
+            if (!idInput.value) {
+                lookup(1, false);
+            }
+        });
+        document.addEventListener('click', function(e) {
+            if (!picker.contains(e.target)) {
+                menu.classList.remove('show');
+            }
+        });
+    });
+});
+
+// One delete confirmation modal per page; the Delete button that opened it supplies the
+// form action and the message
+document.addEventListener('DOMContentLoaded', function() {
+    const modal = document.getElementById('deleteModal');
+    if (!modal) {
+        return;
+    }
+    modal.addEventListener('show.bs.modal', function(event) {
+        const button = event.relatedTarget;
+        if (!button) {
+            return;
+        }
+        modal.querySelector('form').action = button.dataset.deleteUrl;
+        modal.querySelector('.modal-body').textContent = button.dataset.deleteMessage;
+    });
+});
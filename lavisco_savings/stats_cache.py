@@ -0,0 +1,110 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from flask import current_app
+from models import DataVersion
+
+# Entries are stored together with the data version they were computed at, so a write
+# anywhere (which bumps DataVersion) makes every cached value stale without explicit purges.
+
+
+class LRUCache:
+    """In-process cache; each worker keeps its own copy."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """Cache shared by every worker on the host through a small SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM cache')
+        finally:
+            conn.close()
+
+
+def init_cache(app):
+    backend = app.config['STATS_CACHE_BACKEND']
+    if backend == 'sqlite':
+        path = app.config['STATS_CACHE_PATH'] or os.path.join(app.instance_path, 'stats_cache.db')
+        cache = SQLiteCache(path)
+    elif backend == 'memory':
+        cache = LRUCache(app.config['STATS_CACHE_SIZE'])
+    else:
+        raise ValueError(f'Unknown STATS_CACHE_BACKEND: {backend}')
+    app.extensions['stats_cache'] = cache
+    return cache
+
+
+def get_cache():
+    return current_app.extensions['stats_cache']
+
+
+def cached(key, compute, version=None):
+    # Values must be JSON-friendly so the SQLite backend can hold them too
+    if version is None:
+        version = DataVersion.current()
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is not None and entry['version'] == version:
+        return entry['value']
+    value = compute()
+    cache.set(key, {'version': version, 'value': value})
+    return value
@@ -0,0 +1,15 @@
+import os
+import sys
+import pytest
+
+# The app's modules import each other by bare name, as they do when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from seed_data import scratch_app  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on an empty scratch SQLite database; seed it with seed_data.generate()."""
+    return scratch_app(Config, str(tmp_path))
@@ -0,0 +1,13 @@
+from datetime import date
+from pytest import approx
+from aggregates import all_time_savings, week_savings
+from seed_data import generate
+
+
+def test_week_savings_agrees_with_and_without_rollups(app):
+    with app.app_context():
+        generate(ministers=10, payments=300, seed=5, batch_size=300, end_date=date(2026, 10, 11))
+        week_start = date(2026, 10, 5)
+        assert week_savings(week_start, True) > 0
+        assert week_savings(week_start, True) == approx(week_savings(week_start, False))
+        assert all_time_savings(True) == approx(all_time_savings(False))
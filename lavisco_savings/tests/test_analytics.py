@@ -0,0 +1,55 @@
+from datetime import date
+from pytest import approx
+from analytics import savings_analytics, remaining_sundays
+from models import db, Minister, Payment
+
+START, END = date(2026, 9, 7), date(2026, 10, 4)
+
+
+def add_history():
+    # Mary pays 1000 every Sunday in the range and 500 back in January; Peter joins on
+    # 21 September and pays once in his two Sundays
+    mary = Minister(full_name='Mary Nakato', date_joined=date(2020, 1, 1), total_savings=0.0)
+    peter = Minister(full_name='Peter Kato', date_joined=date(2026, 9, 21), total_savings=0.0)
+    db.session.add_all([mary, peter])
+    db.session.flush()
+    payments = [(mary, 500, date(2026, 1, 4)), (peter, 2000, date(2026, 9, 27))]
+    payments += [(mary, 1000, sunday) for sunday in (date(2026, 9, 13), date(2026, 9, 20), date(2026, 9, 27), END)]
+    db.session.add_all(Payment(minister_id=m.id, amount=float(a), payment_date=d, week_number=1) for m, a, d in payments)
+    db.session.commit()
+    return mary.id, peter.id
+
+
+def test_remaining_sundays():
+    assert remaining_sundays(date(2026, 10, 4)) == 12
+    assert remaining_sundays(date(2026, 12, 26)) == 1
+    assert remaining_sundays(date(2026, 12, 27)) == 0
+
+
+def test_weekly_trend_and_totals(app):
+    with app.app_context():
+        add_history()
+        result = savings_analytics(START, END, moving_average_weeks=2, projection_weeks=4)
+
+    assert (result['total_amount'], result['total_payments']) == (6000, 5)
+    assert [w['week_start'] for w in result['weeks']] == ['2026-09-07', '2026-09-14', '2026-09-21', '2026-09-28']
+    assert [w['total'] for w in result['weeks']] == [1000, 1000, 3000, 1000]
+    assert [w['moving_average'] for w in result['weeks']] == [1000, 1000, 2000, 2000]
+    assert result['trend'] == {'slope_per_week': approx(200), 'intercept': approx(1200)}
+    assert result['payment_percentiles']['p50'] == 1000
+
+
+def test_consistency_and_projection_per_minister(app):
+    with app.app_context():
+        mary, peter = add_history()
+        result = savings_analytics(START, END, moving_average_weeks=2, projection_weeks=4)
+
+    by_id = {row['minister_id']: row for row in result['ministers']}
+    assert [row['minister_id'] for row in result['ministers']] == [mary, peter]
+    assert (by_id[mary]['sundays_paid'], by_id[mary]['sundays_missed'], by_id[mary]['consistency']) == (4, 0, 1.0)
+    # Sundays before Peter joined are not held against him
+    assert (by_id[peter]['sundays_paid'], by_id[peter]['sundays_missed'], by_id[peter]['consistency']) == (1, 1, 0.5)
+    assert (by_id[mary]['year_to_date'], by_id[peter]['year_to_date']) == (4500, 2000)
+    # Year to date plus the last four weeks' average for each of the 12 Sundays left
+    assert (by_id[mary]['projected_year_end'], by_id[peter]['projected_year_end']) == (16500, 8000)
+    assert result['projection'] == {'year': 2026, 'year_to_date': 6500, 'remaining_sundays': 12, 'projected_total': 24500}
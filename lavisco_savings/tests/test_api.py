@@ -0,0 +1,102 @@
+from datetime import date
+from models import db, Minister, Payment, DataVersion
+from pagination import keyset_paginate
+from seed_data import login_client
+
+# Three payments share each Sunday, so pages have to break ties on the id
+SUNDAYS = [date(2026, 9, 20), date(2026, 9, 27), date(2026, 10, 4)]
+
+
+def add_payments(count):
+    minister = Minister(full_name='Mary Nakato', date_joined=date(2020, 1, 1), total_savings=0.0)
+    db.session.add(minister)
+    db.session.flush()
+    db.session.add_all(
+        Payment(minister_id=minister.id, amount=1000.0 * (i + 1), payment_date=SUNDAYS[i // 3], week_number=1)
+        for i in range(count)
+    )
+    DataVersion.bump()
+    db.session.commit()
+
+
+def newest_first():
+    return [p.id for p in Payment.query.order_by(Payment.payment_date.desc(), Payment.id.desc())]
+
+
+def walk(client, per_page):
+    pages, after = [], None
+    while True:
+        body = client.get('/api/v1/payments', query_string={'per_page': per_page, 'after': after, 'fields': 'id'}).get_json()
+        pages.append([row['id'] for row in body['data']])
+        after = body['next_cursor']
+        if after is None:
+            return pages, body
+
+
+def test_api_requires_login(app):
+    response = app.test_client().get('/api/v1/payments')
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Login required'}
+
+
+def test_unchanged_poll_gets_304_until_the_next_write(app):
+    with app.app_context():
+        add_payments(3)
+    client = login_client(app)
+
+    first = client.get('/api/v1/totals')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    repeat = client.get('/api/v1/totals', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    assert repeat.headers['ETag'] == etag
+    # The query string is part of the tag
+    assert client.get('/api/v1/totals?start_date=2026-10-01', headers={'If-None-Match': etag}).status_code == 200
+
+    with app.app_context():
+        DataVersion.bump()
+        db.session.commit()
+    changed = client.get('/api/v1/totals', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_cursor_pages_cover_every_payment_once(app):
+    with app.app_context():
+        add_payments(7)
+        expected = newest_first()
+    pages, last = walk(login_client(app), per_page=3)
+    assert pages == [expected[0:3], expected[3:6], expected[6:7]]
+    assert last['prev_cursor'] is not None
+
+
+def test_last_full_page_has_no_next_cursor(app):
+    with app.app_context():
+        add_payments(6)
+        expected = newest_first()
+    pages, _ = walk(login_client(app), per_page=3)
+    assert pages == [expected[0:3], expected[3:6]]
+
+
+def test_before_cursor_returns_the_previous_page(app):
+    with app.app_context():
+        add_payments(7)
+        expected = newest_first()
+        first = keyset_paginate(Payment.query, [Payment.payment_date, Payment.id], per_page=3)
+        second = keyset_paginate(Payment.query, [Payment.payment_date, Payment.id], after=first.next_cursor, per_page=3)
+        back = keyset_paginate(Payment.query, [Payment.payment_date, Payment.id], before=second.prev_cursor, per_page=3)
+
+        assert (first.total, first.has_prev, first.has_next) == (7, False, True)
+        assert [p.id for p in second.items] == expected[3:6]
+        assert [p.id for p in back.items] == expected[0:3]
+        assert not back.has_prev
+
+
+def test_bad_cursor_starts_from_the_newest(app):
+    with app.app_context():
+        add_payments(4)
+        expected = newest_first()
+        page = keyset_paginate(Payment.query, [Payment.payment_date, Payment.id], after='not-a-cursor', per_page=3)
+        assert [p.id for p in page.items] == expected[0:3]
+        assert not page.has_prev
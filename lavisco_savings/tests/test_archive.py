@@ -0,0 +1,57 @@
+from datetime import date
+from aggregates import all_time_savings, minister_totals, payment_summary
+from analytics import savings_analytics
+from archive import archivable_years, archive_year
+from models import db, Minister, Payment, PaymentArchive, ArchivedYear, CarryForward
+from seed_data import generate
+from statements import minister_statement, opening_balances
+
+END = date(2026, 10, 11)
+
+
+def figures():
+    """Every total a reader can see, over ranges before, across and after the boundary."""
+    ministers = Minister.query.order_by(Minister.id).limit(5).all()
+    statements = [minister_statement(m, date(2024, 11, 1), END) for m in ministers]
+    return {
+        'all_time': (all_time_savings(True), all_time_savings(False)),
+        'minister_totals': [tuple(row) for row in minister_totals(date(2024, 6, 1), END)],
+        'old_totals': [tuple(row) for row in minister_totals(date(2023, 1, 1), date(2023, 12, 31))],
+        'summary': payment_summary(date(2023, 7, 1), END).total_amount,
+        'whole_weeks': payment_summary(date(2024, 12, 2), date(2025, 1, 26)).total_amount,
+        'openings': opening_balances(date(2025, 3, 1)),
+        'statements': [(s.opening_balance, s.rows, s.closing_balance) for s in statements],
+        'analytics': savings_analytics(date(2024, 9, 1), END)['total_amount'],
+        'saved': [m.total_savings for m in Minister.query.order_by(Minister.id)],
+    }
+
+
+def test_archiving_keeps_every_total(app):
+    with app.app_context():
+        generate(ministers=30, payments=6000, seed=9, batch_size=2000, end_date=END)
+        hot_before = Payment.query.count()
+        before = figures()
+        frozen_before = dict(db.session.execute(
+            db.select(Payment.minister_id, db.func.sum(Payment.amount))
+            .where(Payment.payment_date < date(2025, 1, 1)).group_by(Payment.minister_id)
+        ).all())
+
+        years = archivable_years(2024)
+        assert years and years[-1] == 2024
+        moved = [archive_year(year) for year in years]
+
+        assert ArchivedYear.boundary() == date(2025, 1, 1)
+        assert Payment.query.filter(Payment.payment_date < date(2025, 1, 1)).count() == 0
+        assert PaymentArchive.query.count() == sum(count for count, _ in moved)
+        assert Payment.query.count() + PaymentArchive.query.count() == hot_before
+        # The last carry-forward holds everything archived, minister by minister
+        carried = {row.minister_id: row.total_amount for row in CarryForward.query.filter_by(year=2024)}
+        assert carried == frozen_before
+        assert sum(carried.values()) == sum(amount for _, amount in moved)
+
+        after = figures()
+
+    assert before['old_totals'] and before['statements'][0][1]
+    # Amounts are whole hundreds, so sums are exact whichever table they come from
+    for name in before:
+        assert after[name] == before[name], name
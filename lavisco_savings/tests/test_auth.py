@@ -0,0 +1,68 @@
+import threading
+import pytest
+from auth import HashingBusy, PasswordHasher, change_password, load_cached_user, verify_password
+from models import db, User
+
+
+def test_slow_hash_is_reported_as_busy():
+    hasher = PasswordHasher(workers=1, max_pending=0, timeout=0.05)
+    release = threading.Event()
+    with pytest.raises(HashingBusy):
+        hasher.run(release.wait, 5)
+    # The pool is still full with the running hash, so the next caller is turned away at once
+    with pytest.raises(HashingBusy):
+        hasher.run(lambda: True)
+    release.set()
+    # Queued behind the slow hash on the single worker, so its slot has been freed by now
+    hasher._executor.submit(lambda: None).result()
+    assert hasher.run(lambda: 'done') == 'done'
+
+
+def add_user(app):
+    with app.app_context():
+        user = User(username='mary', email='mary@example.com', full_name='Mary Nakato')
+        user.set_password('old-password')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def test_cached_user_is_dropped_when_the_row_changes(app):
+    user_id = add_user(app)
+    cache = app.extensions['user_cache']
+    with app.test_request_context():
+        assert load_cached_user(user_id).full_name == 'Mary Nakato'
+        assert cache.get(user_id) is not None
+        assert load_cached_user(user_id).full_name == 'Mary Nakato'
+
+        db.session.get(User, user_id).full_name = 'Mary Nakato Okello'
+        db.session.commit()
+        assert cache.get(user_id) is None
+        assert load_cached_user(user_id).full_name == 'Mary Nakato Okello'
+
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+        assert cache.get(user_id) is None
+        assert load_cached_user(user_id) is None
+
+
+def test_password_change_invalidates_the_cached_hash(app):
+    user_id = add_user(app)
+    with app.test_request_context():
+        load_cached_user(user_id)
+        user = db.session.get(User, user_id)
+        change_password(user, 'new-password')
+        db.session.commit()
+        cached_user = load_cached_user(user_id)
+        assert verify_password(cached_user, 'new-password')
+        assert not verify_password(cached_user, 'old-password')
+
+
+def test_login_answers_503_when_hashing_is_busy(app, monkeypatch):
+    add_user(app)
+
+    def busy(*args):
+        raise HashingBusy()
+    monkeypatch.setattr(app.extensions['password_hasher'], 'run', busy)
+    response = app.test_client().post('/login', data={'username': 'mary', 'password': 'old-password'})
+    assert response.status_code == 503
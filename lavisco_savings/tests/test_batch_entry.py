@@ -0,0 +1,46 @@
+from datetime import date
+from models import db, Minister, Payment, WeeklyRollup, DataVersion
+from seed_data import login_client
+
+
+def add_ministers(*names):
+    ministers = [Minister(full_name=name, date_joined=date(2020, 1, 1), total_savings=0.0) for name in names]
+    db.session.add_all(ministers)
+    db.session.commit()
+    return [minister.id for minister in ministers]
+
+
+def test_batch_records_every_filled_in_amount(app):
+    with app.app_context():
+        mary, john, grace = add_ministers('Mary Nakato', 'John Okello', 'Grace Atim')
+        version = DataVersion.current()
+
+    response = login_client(app).post('/payments/batch', data={
+        'payment_date': '2026-10-11', 'note': 'Harvest',
+        f'amount-{mary}': '5,000', f'amount-{john}': '2500.50', f'amount-{grace}': ''
+    })
+    assert response.status_code == 302
+
+    with app.app_context():
+        payments = Payment.query.order_by(Payment.minister_id).all()
+        assert [(p.minister_id, p.amount, p.week_number, p.note) for p in payments] == [
+            (mary, 5000, 41, 'Harvest'), (john, 2500.5, 41, 'Harvest')
+        ]
+        assert [db.session.get(Minister, i).total_savings for i in (mary, john, grace)] == [5000, 2500.5, 0]
+        assert WeeklyRollup.query.filter_by(week_start=date(2026, 10, 5)).count() == 2
+        assert DataVersion.current() == version + 1
+
+
+def test_one_bad_amount_saves_nothing(app):
+    with app.app_context():
+        mary, john = add_ministers('Mary Nakato', 'John Okello')
+
+    response = login_client(app).post('/payments/batch', data={
+        'payment_date': '2026-10-11', f'amount-{mary}': '5000', f'amount-{john}': 'nan'
+    })
+    assert response.status_code == 200
+    assert b'Nothing has been saved yet' in response.data
+
+    with app.app_context():
+        assert Payment.query.count() == 0
+        assert db.session.get(Minister, mary).total_savings == 0
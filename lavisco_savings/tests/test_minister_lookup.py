@@ -0,0 +1,56 @@
+from datetime import date
+from models import db, Minister, Payment
+from seed_data import login_client
+
+NAMES = ['Esther Kato', 'Agnes Lubega', 'David Atim', 'Grace Okello', 'John Okello']
+
+
+def add_ministers():
+    db.session.add_all(Minister(full_name=name, date_joined=date(2020, 1, 1), total_savings=0.0) for name in NAMES)
+    db.session.commit()
+
+
+def lookup(client, **args):
+    return client.get('/ministers/lookup', query_string=args).get_json()
+
+
+def test_lookup_pages_through_every_minister_alphabetically(app):
+    with app.app_context():
+        add_ministers()
+    client = login_client(app)
+
+    first = lookup(client, per_page=2)
+    second = lookup(client, per_page=2, page=2)
+    last = lookup(client, per_page=2, page=3)
+    assert [r['full_name'] for r in first['results']] == ['Agnes Lubega', 'David Atim']
+    assert [r['full_name'] for r in second['results']] == ['Esther Kato', 'Grace Okello']
+    assert [r['full_name'] for r in last['results']] == ['John Okello']
+    assert (first['has_more'], second['has_more'], last['has_more']) == (True, True, False)
+    assert lookup(client, per_page=5)['has_more'] is False
+
+
+def test_lookup_matches_word_prefixes(app):
+    with app.app_context():
+        add_ministers()
+    client = login_client(app)
+
+    assert {r['full_name'] for r in lookup(client, q='oke')['results']} == {'Grace Okello', 'John Okello'}
+    assert [r['full_name'] for r in lookup(client, q='gr oke')['results']] == ['Grace Okello']
+    assert lookup(client, q='zz')['results'] == []
+
+
+def test_payment_form_checks_the_posted_minister(app):
+    with app.app_context():
+        add_ministers()
+        minister_id = Minister.query.filter_by(full_name='David Atim').one().id
+    client = login_client(app)
+
+    response = client.post('/payments/add', data={'minister_id': 999, 'amount': 5000, 'payment_date': '2026-10-11'})
+    assert response.status_code == 200
+    assert b'Please choose a minister from the list.' in response.data
+
+    response = client.post('/payments/add', data={'minister_id': minister_id, 'amount': 5000, 'payment_date': '2026-10-11'})
+    assert response.status_code == 302
+    with app.app_context():
+        assert Payment.query.one().minister_id == minister_id
+        assert db.session.get(Minister, minister_id).total_savings == 5000
@@ -0,0 +1,48 @@
+from datetime import date
+from models import db, Minister, Payment, WeeklyRollup, DataVersion
+from payment_import import import_payments
+
+
+def add_ministers(*names):
+    ministers = [Minister(full_name=name, date_joined=date(2020, 1, 1), total_savings=0.0) for name in names]
+    db.session.add_all(ministers)
+    db.session.commit()
+    return ministers
+
+
+def test_import_rejects_nan_and_inf_and_keeps_good_rows(app):
+    with app.app_context():
+        mary, john = add_ministers('Mary Nakato', 'John Okello')
+        version = DataVersion.current()
+        result = import_payments(
+            'minister,amount,date\n'
+            f'{mary.id},5000,2026-10-04\n'
+            'John Okello,"2,500",11/10/2026\n'
+            f'{mary.id},nan,2026-10-11\n'
+            f'{john.id},inf,2026-10-11\n'
+            f'{john.id},-Infinity,2026-10-11\n'.encode()
+        )
+
+        assert result.inserted == 2
+        assert result.total_amount == 7500
+        assert [line for line, _ in result.errors] == [4, 5, 6]
+        assert all('at least 0.01' in message for _, message in result.errors)
+
+        assert db.session.get(Minister, mary.id).total_savings == 5000
+        assert db.session.get(Minister, john.id).total_savings == 2500
+        assert db.session.query(db.func.sum(Payment.amount)).scalar() == 7500
+        assert db.session.query(db.func.sum(WeeklyRollup.total_amount)).scalar() == 7500
+        assert DataVersion.current() == version + 1
+
+
+def test_dry_run_and_rejected_files_change_nothing(app):
+    with app.app_context():
+        mary, = add_ministers('Mary Nakato')
+        version = DataVersion.current()
+        assert import_payments(f'minister,amount,date\n{mary.id},5000,2026-10-04\n'.encode(), dry_run=True).inserted == 1
+        assert import_payments(f'minister,amount,date\n{mary.id},NaN,2026-10-04\n'.encode()).inserted == 0
+        assert import_payments(b'minister,amount,date\n\xff\xfe,1,2026-10-04\n').errors[0][0] == 1
+
+        assert Payment.query.count() == 0
+        assert db.session.get(Minister, mary.id).total_savings == 0
+        assert DataVersion.current() == version
@@ -0,0 +1,16 @@
+from models import db
+from query_plans import full_scans, run_checks
+
+
+def test_hot_queries_do_not_scan_payment_tables(app):
+    failures, checked = run_checks(app)
+    assert checked > 0
+    assert not failures, '\n\n'.join(f'{statement}\n    ' + '\n    '.join(plan) for statement, plan in failures)
+
+
+def test_unindexed_filter_is_reported(app):
+    # Guards the plan parser itself: a filter on an unindexed column must register as a scan
+    with app.app_context(), db.engine.connect() as conn:
+        assert full_scans(conn, 'SELECT id FROM payment WHERE note = ?', ('x',))
+        assert full_scans(conn, 'SELECT id FROM payment_archive WHERE note = ?', ('x',))
+        assert not full_scans(conn, 'SELECT id FROM payment WHERE payment_date >= ?', ('2025-01-01',))
@@ -0,0 +1,45 @@
+import report_jobs
+from seed_data import login_client
+
+RANGE = {'start_date': '2026-01-01', 'end_date': '2026-10-11'}
+
+
+def test_slow_pdf_goes_back_to_the_form(app, monkeypatch):
+    def slow(*args, **kwargs):
+        raise TimeoutError('Report job did not finish within 120s')
+    monkeypatch.setattr(report_jobs, 'render_now', slow)
+    response = login_client(app).post('/reports/pdf/summary', data=RANGE)
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/reports')
+
+
+def test_failed_pdf_goes_back_to_the_form(app, monkeypatch):
+    def failed(*args, **kwargs):
+        raise RuntimeError('Report job failed: boom')
+    monkeypatch.setattr(report_jobs, 'render_now', failed)
+    response = login_client(app).post('/reports/statements', data=RANGE)
+    assert response.status_code == 302
+
+
+def test_job_submission_survives_a_vanished_job(app, monkeypatch):
+    monkeypatch.setattr(report_jobs, 'submit', lambda *args: 'summary_20260101_to_20261011_v1')
+    monkeypatch.setattr(report_jobs, 'status', lambda job_id: None)
+    response = login_client(app).post('/reports/jobs/summary', data=RANGE)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'queued'
+
+
+def test_generate_statements_command_has_its_own_timeout(app, monkeypatch):
+    seen = {}
+
+    def timed_out(report_type, start_date, end_date, timeout=None):
+        seen['timeout'] = timeout
+        raise TimeoutError('Report job did not finish')
+    monkeypatch.setattr(report_jobs, 'render_now', timed_out)
+    result = app.test_cli_runner().invoke(args=[
+        'generate-statements', '--start-date', '2026-01-01', '--end-date', '2026-10-11',
+        '--output', 'unused.zip', '--timeout', '900'
+    ])
+    assert result.exit_code == 1
+    assert seen['timeout'] == 900
+    assert 'did not finish' in result.output
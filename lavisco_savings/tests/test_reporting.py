@@ -0,0 +1,54 @@
+import os
+from datetime import date
+from sqlalchemy import event
+from analytics import savings_analytics
+from config import Config
+from models import db, DataVersion
+from reporting import use_reporting
+from report_jobs import job_id_for
+from seed_data import generate, scratch_app
+
+
+def snapshot_app(tmp_path):
+    app = scratch_app(Config, str(tmp_path), REPORTING_SNAPSHOT=True,
+                      REPORTING_SNAPSHOT_PATH=os.path.join(str(tmp_path), 'snapshot.db'))
+    with app.app_context():
+        generate(ministers=20, payments=500, seed=3, batch_size=500, end_date=date(2026, 10, 11))
+    app.extensions['reporting'].refresh()
+    return app
+
+
+def record_statements(engine, seen):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+
+def test_analytics_reads_roster_and_payments_from_one_engine(tmp_path):
+    app = snapshot_app(tmp_path)
+    primary, snapshot = [], []
+    with app.test_request_context():
+        record_statements(db.engine, primary)
+        record_statements(app.extensions['reporting'].engine, snapshot)
+        with use_reporting() as engine:
+            assert engine is app.extensions['reporting'].engine
+            result = savings_analytics(date(2026, 1, 1), date(2026, 10, 11))
+
+    assert result['total_payments'] > 0
+    assert any('FROM minister' in statement for statement in snapshot)
+    assert any('FROM payment' in statement for statement in snapshot)
+    assert not any('FROM minister' in statement or 'FROM payment' in statement for statement in primary)
+
+
+def test_data_version_is_read_from_the_primary(tmp_path):
+    app = snapshot_app(tmp_path)
+    with app.test_request_context():
+        version = DataVersion.current()
+        # A write the snapshot has not caught up with yet
+        DataVersion.bump()
+        db.session.commit()
+        with use_reporting() as engine:
+            assert engine is app.extensions['reporting'].engine
+            assert DataVersion.current() == version + 1
+            job_id = job_id_for('summary', date(2026, 1, 1), date(2026, 10, 11))
+    assert job_id.endswith(f'_v{version + 1}')
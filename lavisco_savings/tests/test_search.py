@@ -0,0 +1,18 @@
+from models import db
+from search import FTS_SETUP, fts_enabled
+
+
+def test_index_created_after_startup_is_picked_up(app):
+    with app.app_context():
+        # As if the app had started before flask init-db made the index
+        db.session.execute(db.text('DROP TABLE minister_fts'))
+        db.session.commit()
+        app.extensions.pop('minister_fts')
+        assert not fts_enabled()
+        assert 'minister_fts' not in app.extensions
+
+        for statement in FTS_SETUP:
+            db.session.execute(db.text(statement))
+        db.session.commit()
+        assert fts_enabled()
+        assert app.extensions['minister_fts'] is True
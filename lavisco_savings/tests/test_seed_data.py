@@ -0,0 +1,19 @@
+from datetime import date
+from models import db, Minister, Payment
+from seed_data import generate
+
+
+def test_payments_start_at_each_ministers_join_date(app):
+    with app.app_context():
+        created, inserted = generate(ministers=20, payments=1000, seed=11, batch_size=250, end_date=date(2026, 10, 11))
+        assert (created, inserted) == (20, 1000)
+        early = db.session.query(db.func.count(Payment.id)).join(Minister).filter(
+            Payment.payment_date < Minister.date_joined
+        ).scalar()
+        assert early == 0
+
+
+def test_generation_stops_when_every_history_runs_out(app):
+    with app.app_context():
+        _, inserted = generate(ministers=1, payments=10000, seed=11, end_date=date(2026, 10, 11))
+        assert 0 < inserted < 10000
@@ -0,0 +1,75 @@
+import io
+from datetime import date
+from models import db, Minister, Payment
+from pdf_reports import build_statement_pdf
+from statements import STATEMENT_COLUMNS, all_statements, minister_statement
+
+BALANCE, CHANGE = STATEMENT_COLUMNS.index('balance'), STATEMENT_COLUMNS.index('change')
+
+
+def add_history():
+    mary = Minister(full_name='Mary Nakato', date_joined=date(2020, 1, 1), total_savings=0.0)
+    peter = Minister(full_name='Peter Kato', date_joined=date(2020, 1, 1), total_savings=0.0)
+    db.session.add_all([mary, peter])
+    db.session.flush()
+    payments = [(mary, 1000, date(2026, 8, 30)), (mary, 1500, date(2026, 9, 6)), (mary, 500, date(2026, 9, 13)),
+                (mary, 2000, date(2026, 10, 4)), (mary, 9999, date(2026, 10, 18)), (peter, 700, date(2026, 8, 2))]
+    db.session.add_all(Payment(minister_id=m.id, amount=float(a), payment_date=d, week_number=1) for m, a, d in payments)
+    db.session.commit()
+    return mary, peter
+
+
+def summary(statement):
+    return [(row[1], row[2], row[BALANCE], row[CHANGE]) for row in statement.rows]
+
+
+def test_running_balance_starts_from_the_opening_balance(app):
+    with app.app_context():
+        mary, _ = add_history()
+        statement = minister_statement(mary, date(2026, 9, 1), date(2026, 10, 11))
+
+    assert statement.opening_balance == 1000
+    # The first change is measured against the payment before the range
+    assert summary(statement) == [
+        (date(2026, 9, 6), 1500, 2500, 500),
+        (date(2026, 9, 13), 500, 3000, -1000),
+        (date(2026, 10, 4), 2000, 5000, 1500),
+    ]
+    assert (statement.closing_balance, statement.total_amount) == (5000, 4000)
+    subtotals = [line for kind, line in statement.lines() if kind == 'subtotal']
+    assert [(int(y), int(m), total) for y, m, total in subtotals] == [(2026, 9, 2000), (2026, 10, 2000)]
+
+
+def test_month_cut_by_the_start_date_is_subtotalled_from_the_start(app):
+    with app.app_context():
+        mary, _ = add_history()
+        statement = minister_statement(mary, date(2026, 9, 10), date(2026, 9, 30))
+
+    assert statement.opening_balance == 2500
+    assert summary(statement) == [(date(2026, 9, 13), 500, 3000, -1000)]
+    assert [line[2] for kind, line in statement.lines() if kind == 'subtotal'] == [500]
+
+
+def test_batch_statements_match_single_statements(app):
+    with app.app_context():
+        mary, peter = add_history()
+        start, end = date(2026, 9, 1), date(2026, 10, 11)
+        batch = {s.minister_id: s for s in all_statements(start, end, batch_size=2)}
+        single = {m.id: minister_statement(m, start, end) for m in (mary, peter)}
+
+    assert batch.keys() == single.keys()
+    for minister_id, statement in single.items():
+        assert batch[minister_id].opening_balance == statement.opening_balance
+        assert batch[minister_id].rows == statement.rows
+    # No payments in the range: the statement is just the balance brought forward
+    assert (batch[peter.id].rows, batch[peter.id].closing_balance, batch[peter.id].total_amount) == ([], 700, 0)
+
+
+def test_statement_pdf_renders_in_chunks(app):
+    with app.app_context():
+        mary, _ = add_history()
+        statement = minister_statement(mary, date(2026, 9, 1), date(2026, 10, 11))
+    output = io.BytesIO()
+    build_statement_pdf(output, statement.start_date, statement.end_date, statement.full_name,
+                        statement.opening_balance, statement.rows, 2)
+    assert output.getvalue().startswith(b'%PDF')